@@ -38,6 +38,12 @@ class Settings(BaseSettings):
     cache_enabled: bool = True
     cache_ttl_seconds: int = 300  # 5 minutes
     
+    # Response Compression (zstd/br need the zstandard/brotli packages)
+    compression_minimum_size: int = 1024
+    gzip_level: int = 6
+    brotli_level: int = 4
+    zstd_level: int = 3
+    
     # Galaxy Integration Settings
     supported_output_formats: List[str] = ["json", "csv", "tsv"]
     default_output_format: str = "json"
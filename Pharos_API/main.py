@@ -11,13 +11,15 @@ import sys
 import os
 from datetime import datetime
 
-# Add current directory to Python path
+# Add current directory to Python path, and the repository root for the shared app.compression
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 DEMO_MODE = os.getenv("DEMO_MODE", "false").lower() == "true"
 
 # Import configuration and routers
 from config import settings, validate_configuration
+from app.compression import CompressionMiddleware
 from api.targets import router as targets_router
 from api.ligands import router as ligands_router
 from api.diseases import router as diseases_router
@@ -56,6 +58,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON/CSV/TSV responses
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    levels={"gzip": settings.gzip_level, "br": settings.brotli_level, "zstd": settings.zstd_level},
+)
+
 # Include routers
 app.include_router(targets_router)
 app.include_router(ligands_router)
@@ -0,0 +1,191 @@
+"""Sparse drug x target activity matrix built from ``act_table_full``.
+
+The ``.npz`` export uses the same keys as ``scipy.sparse.save_npz`` (``data``,
+``indices``, ``indptr``, ``shape``, ``format``) plus ``struct_ids`` and
+``target_ids`` for the row and column dictionaries, so
+``scipy.sparse.load_npz`` reads it directly.
+"""
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.dbversion import VersionedCache
+from app.models import ActTableFull
+
+AGGREGATES = ("max", "median")
+STREAM_CHUNK = 50000
+MAX_CACHED_MATRICES = 16
+
+
+class ActivityMatrix:
+    def __init__(self, struct_ids, target_ids, indptr, indices, data):
+        self.struct_ids = struct_ids
+        self.target_ids = target_ids
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self._exports = {}
+
+    @property
+    def shape(self):
+        return len(self.struct_ids), len(self.target_ids)
+
+    @property
+    def nnz(self):
+        return len(self.data)
+
+    def export(self, fmt: str) -> bytes:
+        if fmt not in self._exports:
+            self._exports[fmt] = EXPORTERS[fmt](self)
+        return self._exports[fmt]
+
+
+def _to_npz(matrix: ActivityMatrix) -> bytes:
+    buf = io.BytesIO()
+    np.savez_compressed(buf, data=matrix.data, indices=matrix.indices, indptr=matrix.indptr,
+                        shape=np.array(matrix.shape), format=np.array("csr"),
+                        struct_ids=matrix.struct_ids, target_ids=matrix.target_ids)
+    return buf.getvalue()
+
+
+def _to_arrow(matrix: ActivityMatrix) -> bytes:
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise RuntimeError("pyarrow is not installed") from e
+    rows = np.repeat(np.arange(len(matrix.struct_ids)), np.diff(matrix.indptr))
+    table = pa.table({
+        "struct_id": matrix.struct_ids[rows],
+        "target_id": matrix.target_ids[matrix.indices],
+        "act_value": matrix.data,
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+EXPORTERS = {"npz": _to_npz, "arrow": _to_arrow}
+
+
+def _stream_triples(db: Session, act_type: Optional[str], organism: Optional[str]):
+    stmt = (select(ActTableFull.struct_id, ActTableFull.target_id, ActTableFull.act_value)
+            .where(ActTableFull.act_value.is_not(None)))
+    if act_type:
+        stmt = stmt.where(ActTableFull.act_type == act_type)
+    if organism:
+        stmt = stmt.where(ActTableFull.organism == organism)
+    sids, tids, vals = [], [], []
+    result = db.execute(stmt.execution_options(yield_per=STREAM_CHUNK))
+    for chunk in result.partitions():
+        block = np.array(chunk, dtype=np.float64).reshape(-1, 3)
+        sids.append(block[:, 0].astype(np.int64))
+        tids.append(block[:, 1].astype(np.int64))
+        vals.append(block[:, 2])
+    if not vals:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0, dtype=np.float64)
+    return np.concatenate(sids), np.concatenate(tids), np.concatenate(vals)
+
+
+def build_activity_matrix(db: Session, act_type: Optional[str] = None,
+                          organism: Optional[str] = None, aggregate: str = "max") -> ActivityMatrix:
+    sids, tids, vals = _stream_triples(db, act_type, organism)
+    struct_ids, rows = np.unique(sids, return_inverse=True)
+    target_ids, cols = np.unique(tids, return_inverse=True)
+
+    # sort by cell then value so each (row, col) group is contiguous and ordered
+    order = np.lexsort((vals, cols, rows))
+    rows, cols, vals = rows[order], cols[order], vals[order]
+    new_cell = np.ones(len(vals), dtype=bool)
+    new_cell[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+    starts = np.flatnonzero(new_cell)
+    counts = np.diff(np.append(starts, len(vals)))
+
+    if aggregate == "max":
+        data = vals[starts + counts - 1]
+    else:
+        data = (vals[starts + (counts - 1) // 2] + vals[starts + counts // 2]) / 2
+
+    cell_rows = rows[starts]
+    indptr = np.zeros(len(struct_ids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(cell_rows, minlength=len(struct_ids)), out=indptr[1:])
+    return ActivityMatrix(struct_ids, target_ids, indptr, cols[starts].astype(np.int32),
+                          data.astype(np.float32))
+
+
+class MatrixCache:
+    """Matrices built so far for one release, keyed by (act_type, organism, aggregate).
+
+    Filters are checked against the act_type and organism values present in the
+    release, and at most ``MAX_CACHED_MATRICES`` are kept, least recently used
+    first out. ``lock`` only guards the dictionaries: a matrix is built outside
+    it, and concurrent requests for the same key wait on its future in
+    ``building``.
+    """
+
+    def __init__(self, act_types, organisms):
+        self.act_types = frozenset(act_types)
+        self.organisms = frozenset(organisms)
+        self.matrices: "OrderedDict[tuple, ActivityMatrix]" = OrderedDict()
+        self.building: Dict[tuple, Future] = {}
+        self.lock = threading.Lock()
+
+    def known(self, act_type: Optional[str], organism: Optional[str]) -> bool:
+        return (act_type is None or act_type in self.act_types) and \
+            (organism is None or organism in self.organisms)
+
+
+def build_matrix_cache(db: Session) -> MatrixCache:
+    act_types = db.execute(select(ActTableFull.act_type).distinct()).scalars()
+    organisms = db.execute(select(ActTableFull.organism).distinct()).scalars()
+    return MatrixCache([v for v in act_types if v], [v for v in organisms if v])
+
+
+# dropped, with every matrix in it, when dbversion changes
+activity_matrices = VersionedCache(build_matrix_cache)
+
+
+def get_activity_matrix(act_type: Optional[str], organism: Optional[str],
+                        aggregate: str) -> Optional[ActivityMatrix]:
+    """The cached matrix for these filters, built on first use; None for unknown filter values."""
+    cache = activity_matrices.get()
+    if not cache.known(act_type, organism):
+        return None
+    key = (act_type, organism, aggregate)
+    with cache.lock:
+        if key in cache.matrices:
+            cache.matrices.move_to_end(key)
+            return cache.matrices[key]
+        future = cache.building.get(key)
+        owner = future is None
+        if owner:
+            future = cache.building[key] = Future()
+    if not owner:
+        return future.result()
+    try:
+        # built on its own session, outside the request's statement timeout
+        db = SessionLocal()
+        try:
+            matrix = build_activity_matrix(db, act_type, organism, aggregate)
+        finally:
+            db.close()
+    except BaseException as e:
+        with cache.lock:
+            del cache.building[key]
+        future.set_exception(e)
+        raise
+    with cache.lock:
+        cache.matrices[key] = matrix
+        while len(cache.matrices) > MAX_CACHED_MATRICES:
+            cache.matrices.popitem(last=False)
+        del cache.building[key]
+    future.set_result(matrix)
+    return matrix
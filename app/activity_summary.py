@@ -0,0 +1,102 @@
+"""Per-target activity statistics from a columnar snapshot of ``act_table_full``.
+
+All targets are summarised in one pass of sorts and ``reduceat`` calls when the
+snapshot is built; requests only read the resulting dicts.
+"""
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.dbversion import VersionedCache
+from app.models import ActTableFull
+
+STREAM_CHUNK = 50000
+
+
+def _group_starts(*keys):
+    """Start offsets of runs of equal values across already-sorted key arrays."""
+    new = np.zeros(len(keys[0]), dtype=bool)
+    if len(new):
+        new[0] = True
+    for key in keys:
+        new[1:] |= key[1:] != key[:-1]
+    return np.flatnonzero(new)
+
+
+def _load_columns(db: Session):
+    stmt = select(ActTableFull.target_id, ActTableFull.struct_id, ActTableFull.act_value,
+                  ActTableFull.act_type, ActTableFull.moa, ActTableFull.first_in_class)
+    target, struct, value, act_type, moa, fic = [], [], [], [], [], []
+    for chunk in db.execute(stmt.execution_options(yield_per=STREAM_CHUNK)).partitions():
+        for t, s, v, a, m, f in chunk:
+            target.append(t)
+            struct.append(s)
+            value.append(np.nan if v is None else v)
+            act_type.append(a or "")
+            moa.append(m == 1)
+            fic.append(f == 1)
+    return (np.array(target, dtype=np.int64), np.array(struct, dtype=np.int64),
+            np.array(value, dtype=np.float64), np.array(act_type, dtype=object),
+            np.array(moa, dtype=bool), np.array(fic, dtype=bool))
+
+
+class ActivitySummaries(NamedTuple):
+    by_target: Dict[int, dict]
+    target_ids: List[int]  # sorted, for paging
+
+
+def build_activity_summaries(db: Session) -> ActivitySummaries:
+    target, struct, value, act_type, moa, fic = _load_columns(db)
+    if not len(target):
+        return ActivitySummaries({}, [])
+    type_names, type_codes = np.unique(act_type, return_inverse=True)
+
+    # activities, distinct ligands, MoA ligands and first-in-class drugs per target
+    order = np.lexsort((struct, target))
+    t, s, m, f = target[order], struct[order], moa[order], fic[order]
+    pair_starts = _group_starts(t, s)
+    pair_target = t[pair_starts]
+    pair_struct = s[pair_starts]
+    pair_moa = np.maximum.reduceat(m.astype(np.int8), pair_starts).astype(bool)
+    pair_fic = np.maximum.reduceat((m & f).astype(np.int8), pair_starts).astype(bool)
+
+    target_starts = _group_starts(t)
+    target_ids = t[target_starts]
+    activities = np.diff(np.append(target_starts, len(t)))
+    pair_target_starts = _group_starts(pair_target)
+    ligands = np.diff(np.append(pair_target_starts, len(pair_target)))
+    moa_ligands = np.add.reduceat(pair_moa.astype(np.int64), pair_target_starts)
+
+    summaries = {}
+    for i, target_id in enumerate(target_ids.tolist()):
+        lo = pair_target_starts[i]
+        hi = pair_target_starts[i + 1] if i + 1 < len(pair_target_starts) else len(pair_target)
+        summaries[target_id] = {
+            "target_id": target_id,
+            "activities": int(activities[i]),
+            "ligands": int(ligands[i]),
+            "moa_ligands": int(moa_ligands[i]),
+            "first_in_class": pair_struct[lo:hi][pair_fic[lo:hi]].tolist(),
+            "by_act_type": {},
+        }
+
+    # count/min/median/max of act_value per (target, act_type), NaN values excluded
+    valid = ~np.isnan(value)
+    vt, vc, vv = target[valid], type_codes[valid], value[valid]
+    order = np.lexsort((vv, vc, vt))
+    vt, vc, vv = vt[order], vc[order], vv[order]
+    starts = _group_starts(vt, vc)
+    counts = np.diff(np.append(starts, len(vv)))
+    mins = vv[starts]
+    maxs = vv[starts + counts - 1]
+    medians = (vv[starts + (counts - 1) // 2] + vv[starts + counts // 2]) / 2
+    for target_id, code, n, lo, med, hi in zip(vt[starts].tolist(), vc[starts].tolist(), counts.tolist(),
+                                               mins.tolist(), medians.tolist(), maxs.tolist()):
+        summaries[target_id]["by_act_type"][type_names[code] or "unspecified"] = {
+            "count": n, "min": lo, "median": med, "max": hi}
+    return ActivitySummaries(summaries, target_ids.tolist())
+
+
+activity_summaries = VersionedCache(build_activity_summaries)
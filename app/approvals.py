@@ -0,0 +1,68 @@
+"""Per-drug approval summaries and yearly counts, computed once per dbversion."""
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.dbversion import VersionedCache
+from app.models import Approval
+
+ANY = "*"
+
+
+class ApprovalSummaries:
+    def __init__(self, rows: List[dict]):
+        self.by_struct: Dict[int, dict] = {}
+        self.by_agency: Dict[str, List[dict]] = {}
+        self.by_year: Dict[int, List[dict]] = {}
+        # (agency or ANY, orphan or ANY) -> {year: count}
+        self.histograms: Dict[Tuple[str, object], Counter] = {}
+
+        for row in sorted(rows, key=lambda r: (r["struct_id"], r["approval"] is None, r["approval"])):
+            summary = self.by_struct.setdefault(row["struct_id"], {
+                "struct_id": row["struct_id"], "first_approval": None, "first_by_agency": {},
+                "orphan": False, "approval_count": 0, "approvals": []})
+            summary["approvals"].append(row)
+            summary["approval_count"] += 1
+            summary["orphan"] = summary["orphan"] or bool(row["orphan"])
+            self.by_agency.setdefault((row["type"] or "").casefold(), []).append(row)
+            if row["approval"] is None:
+                continue
+            summary["first_by_agency"].setdefault(row["type"], row["approval"])
+            if summary["first_approval"] is None:
+                summary["first_approval"] = row["approval"]
+            year = row["approval"].year
+            self.by_year.setdefault(year, []).append(row)
+            agency = row["type"].casefold()
+            for key in ((agency, bool(row["orphan"])), (agency, ANY), (ANY, bool(row["orphan"])), (ANY, ANY)):
+                self.histograms.setdefault(key, Counter())[year] += 1
+        # the unfiltered listing, in the same per-drug order as the other indexes
+        self.all_rows = [row for summary in self.by_struct.values() for row in summary["approvals"]]
+
+    def histogram(self, agency: Optional[str] = None, orphan: Optional[bool] = None) -> Dict[int, int]:
+        key = (agency.casefold() if agency else ANY, ANY if orphan is None else orphan)
+        return dict(sorted(self.histograms.get(key, Counter()).items()))
+
+    def approvals(self, agency: Optional[str] = None, year: Optional[int] = None,
+                  orphan: Optional[bool] = None) -> List[dict]:
+        if year is not None:
+            rows = self.by_year.get(year, [])
+            if agency:
+                rows = [r for r in rows if r["type"].casefold() == agency.casefold()]
+        elif agency:
+            rows = self.by_agency.get(agency.casefold(), [])
+        else:
+            rows = self.all_rows
+        if orphan is not None:
+            rows = [r for r in rows if bool(r["orphan"]) == orphan]
+        return rows
+
+
+def build_approval_summaries(db: Session) -> ApprovalSummaries:
+    rows = [dict(row) for row in db.execute(
+        select(Approval.struct_id, Approval.type, Approval.approval, Approval.applicant, Approval.orphan)).mappings()]
+    return ApprovalSummaries(rows)
+
+
+approval_summaries = VersionedCache(build_approval_summaries)
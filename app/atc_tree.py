@@ -0,0 +1,81 @@
+"""Precomputed WHO ATC hierarchy.
+
+ATC codes are prefix-hierarchical, so sorting every code from level 1 to 5
+gives a pre-order walk of the tree and each subtree is a contiguous range
+found with two bisects.
+"""
+from bisect import bisect_left
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.dbversion import VersionedCache
+from app.models import Atc, Struct2atc
+
+# ATC code length at levels 1..5
+LEVEL_LENGTHS = {1: 1, 2: 3, 3: 4, 4: 5, 5: 7}
+LEVEL_BY_LENGTH = {length: level for level, length in LEVEL_LENGTHS.items()}
+
+
+def normalize(code: str) -> str:
+    return code.strip().upper()
+
+
+class AtcTree:
+    def __init__(self, names: dict, struct_codes: List[tuple]):
+        self.codes = sorted(names)
+        self.names = [names[c] for c in self.codes]
+        pairs = sorted((normalize(code), struct_id) for struct_id, code in struct_codes)
+        self.drug_codes = [code for code, _ in pairs]
+        self.drug_structs = [struct_id for _, struct_id in pairs]
+
+    def _range(self, keys: List[str], code: str):
+        lo = bisect_left(keys, code)
+        return lo, bisect_left(keys, code + "\uffff", lo)
+
+    def subtree(self, code: str) -> Optional[dict]:
+        code = normalize(code)
+        lo, hi = self._range(self.codes, code)
+        if lo == hi or self.codes[lo] != code:
+            return None
+        root = None
+        stack = []
+        for i in range(lo, hi):
+            node = {"code": self.codes[i], "name": self.names[i],
+                    "level": LEVEL_BY_LENGTH.get(len(self.codes[i])), "children": []}
+            while stack and not node["code"].startswith(stack[-1]["code"]):
+                stack.pop()
+            if stack:
+                stack[-1]["children"].append(node)
+            else:
+                root = node
+            stack.append(node)
+        return root
+
+    def drugs(self, code: str) -> Optional[List[dict]]:
+        code = normalize(code)
+        lo, hi = self._range(self.codes, code)
+        if lo == hi or self.codes[lo] != code:
+            return None
+        lo, hi = self._range(self.drug_codes, code)
+        return [{"struct_id": self.drug_structs[i], "atc_code": self.drug_codes[i]} for i in range(lo, hi)]
+
+    def compact(self) -> dict:
+        return {"codes": self.codes, "names": self.names}
+
+
+def build_atc_tree(db: Session) -> AtcTree:
+    names = {}
+    for row in db.execute(select(Atc.code, Atc.chemical_substance, Atc.l1_code, Atc.l1_name, Atc.l2_code,
+                                 Atc.l2_name, Atc.l3_code, Atc.l3_name, Atc.l4_code, Atc.l4_name)):
+        code, substance, *levels = row
+        for level_code, level_name in zip(levels[::2], levels[1::2]):
+            if level_code:
+                names.setdefault(normalize(level_code), level_name)
+        names[normalize(code)] = substance
+    struct_codes = db.execute(select(Struct2atc.struct_id, Struct2atc.atc_code)).all()
+    return AtcTree(names, struct_codes)
+
+
+atc_tree = VersionedCache(build_atc_tree)
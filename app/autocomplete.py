@@ -0,0 +1,92 @@
+"""In-memory prefix index for drug name typeahead.
+
+Names from structures, synonyms and products are lower-cased into one sorted
+list; a prefix query is two ``bisect`` calls plus a small ranked scan.
+"""
+import heapq
+from bisect import bisect_left
+from typing import List, NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.dbversion import VersionedCache
+from app.models import ActiveIngredient, Product, Structures, Synonyms
+
+# lower wins when the same name maps to the same struct from several tables
+SOURCE_PRIORITY = {"structure": 0, "synonym": 1, "product": 2}
+
+# prefixes this short match too many names to rank on every keystroke,
+# so their top completions are computed once at build time
+PRECOMPUTED_PREFIX_LEN = 2
+PRECOMPUTED_TOP_K = 50
+
+
+class Completion(NamedTuple):
+    key: str
+    name: str
+    struct_id: int
+    source: str
+
+    @property
+    def rank(self):
+        return (SOURCE_PRIORITY[self.source], len(self.key), self.key)
+
+
+def normalize(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+class PrefixIndex:
+    def __init__(self, completions: List[Completion]):
+        self.entries = sorted(completions, key=lambda c: (c.key, c.rank))
+        self.keys = [c.key for c in self.entries]
+        self.top = {}
+        for n in range(1, PRECOMPUTED_PREFIX_LEN + 1):
+            buckets = {}
+            for c in self.entries:
+                if len(c.key) >= n:
+                    buckets.setdefault(c.key[:n], []).append(c)
+            for prefix, bucket in buckets.items():
+                self.top[prefix] = heapq.nsmallest(PRECOMPUTED_TOP_K, bucket, key=lambda c: c.rank)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def complete(self, q: str, limit: int = 10) -> List[Completion]:
+        prefix = normalize(q)
+        if not prefix:
+            return []
+        if prefix in self.top and limit <= PRECOMPUTED_TOP_K:
+            return self.top[prefix][:limit]
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + "\uffff", lo)
+        return heapq.nsmallest(limit, self.entries[lo:hi], key=lambda c: c.rank)
+
+
+def build_prefix_index(db: Session) -> PrefixIndex:
+    best = {}
+
+    def add(name, struct_id, source):
+        if not name or struct_id is None:
+            return
+        key = normalize(name)
+        current = best.get((key, struct_id))
+        if current is None or SOURCE_PRIORITY[source] < SOURCE_PRIORITY[current.source]:
+            best[(key, struct_id)] = Completion(key, name.strip(), struct_id, source)
+
+    for name, struct_id in db.execute(select(Structures.name, Structures.id)):
+        add(name, struct_id, "structure")
+    for name, struct_id in db.execute(select(Synonyms.name, Synonyms.id)):
+        add(name, struct_id, "synonym")
+    product_names = (
+        select(Product.product_name, ActiveIngredient.struct_id)
+        .join(ActiveIngredient, ActiveIngredient.ndc_product_code == Product.ndc_product_code)
+        .distinct()
+    )
+    for name, struct_id in db.execute(product_names):
+        add(name, struct_id, "product")
+    return PrefixIndex(list(best.values()))
+
+
+prefix_index = VersionedCache(build_prefix_index)
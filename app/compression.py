@@ -0,0 +1,242 @@
+"""Content-negotiated response compression (zstd, brotli, gzip).
+
+Compresses text payloads at or above ``minimum_size`` bytes with the best
+coding the client accepts. Streaming responses are compressed as they arrive
+and flushed to the client every ``flush_size`` bytes of input and at the end,
+so the body is never buffered whole but small chunks (a row per message)
+still share one compression context. brotli and zstd are used when the
+``brotli`` / ``zstandard`` packages are installed. Every compressible response
+carries ``Vary: Accept-Encoding``, coded or not, and so does every 304.
+
+The Pharos API imports this module too; its image is built from the
+repository root (see Pharos_API/Dockerfile).
+"""
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+COMPRESSION_MINIMUM_SIZE = int(os.environ.get("COMPRESSION_MINIMUM_SIZE", 1024))
+# uncompressed bytes of a streaming response taken in between flushes to the client
+COMPRESSION_FLUSH_SIZE = int(os.environ.get("COMPRESSION_FLUSH_SIZE", 64 * 1024))
+DEFAULT_LEVELS = {
+    "zstd": int(os.environ.get("ZSTD_LEVEL", 3)),
+    "br": int(os.environ.get("BROTLI_LEVEL", 4)),
+    "gzip": int(os.environ.get("GZIP_LEVEL", 6)),
+}
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/xml", "application/x-ndjson",
+                      "application/javascript", "+json", "+xml")
+
+
+class GzipEncoder:
+    def __init__(self, level: int):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._z.compress(data)
+
+    def flush(self) -> bytes:
+        return self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._z.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    def __init__(self, level: int):
+        self._b = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._b.process(data)
+
+    def flush(self) -> bytes:
+        return self._b.flush()
+
+    def finish(self) -> bytes:
+        return self._b.finish()
+
+
+class ZstdEncoder:
+    def __init__(self, level: int):
+        self._z = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._z.compress(data)
+
+    def flush(self) -> bytes:
+        return self._z.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._z.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+ENCODERS = {"gzip": GzipEncoder}
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+
+# server preference when the client weighs codings equally
+PREFERENCE = ("zstd", "br", "gzip")
+
+
+def parse_accept_encoding(header: str) -> dict:
+    weights = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding.strip().lower()] = q
+    return weights
+
+
+def choose_encoding(header: str, available=PREFERENCE):
+    weights = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.split(";", 1)[0].strip().lower()
+    return any(content_type.startswith(t) if t.endswith("/") else content_type.endswith(t)
+               for t in COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MINIMUM_SIZE, levels: dict = None,
+                 encodings=PREFERENCE, flush_size: int = COMPRESSION_FLUSH_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.flush_size = flush_size
+        self.levels = dict(DEFAULT_LEVELS, **(levels or {}))
+        self.encodings = tuple(e for e in encodings if e in ENCODERS)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        accept = ""
+        for key, value in scope["headers"]:
+            if key.lower() == b"accept-encoding":
+                accept = value.decode("latin-1")
+        coding = choose_encoding(accept, self.encodings) if accept else None
+        if scope["method"] == "HEAD":
+            coding = None  # headers only, but with the same Vary as GET
+        level = self.levels[coding] if coding else None
+        await self.app(scope, receive, _CompressingSend(send, coding, level, self.minimum_size, self.flush_size))
+
+
+def _with_vary(headers):
+    """``headers`` with Accept-Encoding added to Vary, keeping any other Vary fields."""
+    out, found = [], False
+    for key, value in headers:
+        if key.lower() == b"vary":
+            found = True
+            fields = [f.strip().lower() for f in value.split(b",")]
+            if b"accept-encoding" not in fields and b"*" not in fields:
+                value = value + b", Accept-Encoding"
+        out.append((key, value))
+    if not found:
+        out.append((b"vary", b"Accept-Encoding"))
+    return out
+
+
+class _CompressingSend:
+    """Holds back the response start until the first body chunk shows whether to compress.
+
+    ``coding`` is None when the client accepts no coding we have; the response
+    is then sent as is, with Vary added if it could have been compressed.
+    """
+
+    def __init__(self, send, coding: str, level: int, minimum_size: int, flush_size: int):
+        self.send = send
+        self.coding = coding
+        self.level = level
+        self.minimum_size = minimum_size
+        self.flush_size = flush_size
+        self.start = None
+        self.encoder = None
+        self.unflushed = 0
+        self.passthrough = False
+
+    def _headers(self, body_length=None):
+        headers = []
+        for key, value in self.start.get("headers", []):
+            name = key.lower()
+            if name == b"content-length":
+                continue
+            if name == b"etag" and not value.startswith(b"W/"):
+                value = b"W/" + value  # the coded body is a different representation
+            headers.append((key, value))
+        headers.append((b"content-encoding", self.coding.encode()))
+        if body_length is not None:
+            headers.append((b"content-length", str(body_length).encode()))
+        return headers
+
+    async def __call__(self, message):
+        if self.passthrough:
+            return await self.send(message)
+        if message["type"] == "http.response.start":
+            headers = {k.lower(): v for k, v in message.get("headers", [])}
+            if message["status"] == 304:
+                # a 304 carries the Vary its 200 would have; shared caches key on it
+                self.passthrough = True
+                return await self.send(dict(message, headers=_with_vary(message.get("headers", []))))
+            if message["status"] < 200 or message["status"] in (204, 206) \
+                    or b"content-encoding" in headers \
+                    or not is_compressible(headers.get(b"content-type", b"").decode("latin-1")):
+                self.passthrough = True
+                return await self.send(message)
+            message = dict(message, headers=_with_vary(message.get("headers", [])))
+            if self.coding is None:
+                self.passthrough = True
+                return await self.send(message)
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            return await self.send(message)
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.encoder is None:
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(self.start)
+                return await self.send(message)
+            self.encoder = ENCODERS[self.coding](self.level)
+            if not more_body:
+                data = self.encoder.compress(body) + self.encoder.finish()
+                await self.send(dict(self.start, headers=self._headers(len(data))))
+                return await self.send({"type": "http.response.body", "body": data})
+            await self.send(dict(self.start, headers=self._headers()))
+        data = self.encoder.compress(body)
+        if not more_body:
+            data += self.encoder.finish()
+        else:
+            # flushing every message would restart the coder's blocks on each small chunk
+            self.unflushed += len(body)
+            if self.unflushed >= self.flush_size:
+                data += self.encoder.flush()
+                self.unflushed = 0
+            if not data:
+                return
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
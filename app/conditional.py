@@ -0,0 +1,159 @@
+"""Conditional GET for read endpoints: responses only change when Dbversion does.
+
+The ETag is derived from the release, the path and the normalized query string.
+It is weak: it names the release's content, which may be sent under different
+content codings (see app/compression.py). The release only moves once every
+database a response can come from has it (the primary and each healthy read
+replica), and seeing it move expires every VersionedCache, so requests that
+start after the move are answered from the new release. A request already
+running when it moves may still send old-release data under the new ETag.
+
+Routes whose data does not come from the database alone, such as ``/doid``
+(whose hierarchy is read from ``DOID_OBO_PATH``), are excluded.
+
+An ``If-None-Match`` naming the current ETag is answered with 304 before the
+route, and its queries, run: the tag was only ever sent with a 200 for this
+path and release. ``*`` matches nothing here. An ``If-Modified-Since`` at or
+after the release time proves nothing about the resource, so it is checked
+once the route has answered 200.
+"""
+import datetime
+import hashlib
+import os
+from email.utils import format_datetime, parsedate_to_datetime
+from urllib.parse import parse_qsl, urlencode
+
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.database import router
+from app.dbversion import VersionedCache, expire_all
+from app.models import Dbversion
+
+CACHE_MAX_AGE = int(os.environ.get("CACHE_MAX_AGE", 86400))
+
+# health checks, partial (time-limited) results, admin reports, DRS objects, which carry their own ETags,
+# and the Disease Ontology, whose hierarchy comes from an OBO file outside the release
+EXCLUDED_PREFIXES = ("/ga4gh/drs/", "/search", "/admin/", "/docs", "/openapi.json", "/doid")
+EXCLUDED_PATHS = ("/",)
+
+
+def read_release(db: Session):
+    """(version, dtime) of the current release; dtime is stored without a zone and taken as UTC."""
+    row = db.execute(select(Dbversion.version, Dbversion.dtime).order_by(Dbversion.version.desc()).limit(1)).first()
+    if row is None:
+        return None
+    version, dtime = row
+    if dtime is not None and dtime.tzinfo is None:
+        dtime = dtime.replace(tzinfo=datetime.timezone.utc)
+    return version, dtime
+
+
+def read_served_release(db: Session):
+    """The oldest release among the primary and the healthy replicas."""
+    current = read_release(db)
+    for replica in router.replicas:
+        if not router.healthy(replica):
+            continue
+        try:
+            with Session(replica) as replica_db:
+                lagging = read_release(replica_db)
+        except SQLAlchemyError:
+            router.mark_down(replica)
+            continue
+        if current is None or (lagging is not None and lagging[0] < current[0]):
+            current = lagging
+    return current
+
+
+def build_release(db: Session):
+    # the in-memory caches re-check Dbversion before any response carries the new ETag
+    expire_all()
+    return read_served_release(db)
+
+
+release = VersionedCache(build_release, read_version=read_served_release)
+
+
+def normalize_query(query_string: bytes) -> str:
+    return urlencode(sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)))
+
+
+def make_etag(version, path: str, query: str) -> str:
+    return 'W/"' + hashlib.sha256(f"{version}|{path}|{query}".encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return etag.removeprefix("W/") in tags
+
+
+def not_modified_since(if_modified_since: str, dtime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=datetime.timezone.utc)
+    return dtime.replace(microsecond=0) <= since
+
+
+class ConditionalGetMiddleware:
+    def __init__(self, app, max_age: int = CACHE_MAX_AGE):
+        self.app = app
+        self.max_age = max_age
+
+    @staticmethod
+    async def not_modified(send, cache_headers):
+        await send({"type": "http.response.start", "status": 304, "headers": cache_headers})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            return await self.app(scope, receive, send)
+        path = scope["path"]
+        if path in EXCLUDED_PATHS or path.startswith(EXCLUDED_PREFIXES):
+            return await self.app(scope, receive, send)
+        try:
+            # re-reads Dbversion at most once per check interval, off the event loop
+            current = release.get() if release.fresh() else await run_in_threadpool(release.get)
+        except SQLAlchemyError:
+            current = None
+        if current is None:
+            return await self.app(scope, receive, send)
+
+        version, dtime = current
+        etag = make_etag(version, path, normalize_query(scope.get("query_string", b"")))
+        cache_headers = [(b"etag", etag.encode()), (b"cache-control", f"public, max-age={self.max_age}".encode())]
+        if dtime is not None:
+            last_modified = format_datetime(dtime.astimezone(datetime.timezone.utc), usegmt=True)
+            cache_headers.append((b"last-modified", last_modified.encode()))
+
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        if "if-none-match" in headers:
+            if etag_matches(headers["if-none-match"], etag):
+                return await self.not_modified(send, cache_headers)
+            unmodified = False
+        else:
+            unmodified = dtime is not None and "if-modified-since" in headers and \
+                not_modified_since(headers["if-modified-since"], dtime)
+        replaced = False
+
+        async def send_with_etag(message):
+            nonlocal replaced
+            if replaced:
+                return  # body of a response already answered with 304
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                existing = {k.lower() for k, _ in message.get("headers", [])}
+                if b"etag" not in existing:
+                    if unmodified:
+                        replaced = True
+                        return await self.not_modified(send, cache_headers)
+                    message = dict(message, headers=list(message.get("headers", [])) +
+                                   [h for h in cache_headers if h[0] not in existing])
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
@@ -1,7 +1,34 @@
+import os
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-DATABASE_URL = ""
+from app.db_routing import ReplicaRouter, RoutingSession
+
+DATABASE_URL = os.environ.get("DATABASE_URL", "")
+
+# comma-separated read replica URLs; request sessions are spread across the healthy ones
+DATABASE_REPLICA_URLS = [url for url in os.environ.get("DATABASE_REPLICA_URLS", "").split(",") if url]
+
+# Serve from a read-only file built by `python -m app.snapshot` instead of DATABASE_URL
+DRUGCENTRAL_SNAPSHOT = os.environ.get("DRUGCENTRAL_SNAPSHOT")
+
+# psycopg 3 (postgresql+psycopg://) prepares a statement server-side once it has
+# run this many times on a connection; unset leaves the driver default
+DB_PREPARE_THRESHOLD = os.environ.get("DB_PREPARE_THRESHOLD")
+
+connect_args = {}
+if DB_PREPARE_THRESHOLD and DATABASE_URL.startswith("postgresql+psycopg://"):
+    connect_args["prepare_threshold"] = int(DB_PREPARE_THRESHOLD)
 
-engine = create_engine(DATABASE_URL)
+replicas = []
+if DRUGCENTRAL_SNAPSHOT:
+    from app.snapshot import read_only_engine
+    engine = read_only_engine(DRUGCENTRAL_SNAPSHOT)
+else:
+    engine = create_engine(DATABASE_URL, connect_args=connect_args)
+    replicas = [create_engine(url, connect_args=connect_args, pool_pre_ping=True) for url in DATABASE_REPLICA_URLS]
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+router = ReplicaRouter(engine, replicas)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=RoutingSession,
+                                router=router)
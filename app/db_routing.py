@@ -0,0 +1,106 @@
+"""Read routing across replicas, per-route statement timeouts and query cancellation.
+
+Each request session is bound to one engine picked round robin from the
+healthy read replicas (the primary when there are none). A replica that
+fails to connect or drops connections is skipped for ``REPLICA_COOLDOWN``
+seconds. On Postgres every transaction starts with ``SET LOCAL
+statement_timeout`` for the route's budget, and the running query is
+cancelled if the HTTP client disconnects.
+"""
+import asyncio
+import itertools
+import os
+import threading
+import time
+from typing import Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+DEFAULT_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 5000))
+REPLICA_COOLDOWN = 30.0
+DISCONNECT_POLL = 0.25
+QUERY_CANCELED = "57014"  # Postgres SQLSTATE for statement timeout / cancel request
+
+# route path template -> statement timeout in ms, for routes that differ from the default
+STATEMENT_TIMEOUTS: Dict[str, int] = {}
+
+
+class ReplicaRouter:
+    def __init__(self, primary, replicas: List = ()):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self._down_until: Dict[int, float] = {}
+        self._cycle = itertools.cycle(range(len(self.replicas))) if self.replicas else None
+        self._lock = threading.Lock()
+        for replica in self.replicas:
+            event.listen(replica, "handle_error", self._on_error)
+
+    def _on_error(self, context):
+        if context.is_disconnect or context.connection is None:
+            self.mark_down(context.engine)
+
+    def mark_down(self, engine):
+        with self._lock:
+            self._down_until[id(engine)] = time.monotonic() + REPLICA_COOLDOWN
+
+    def healthy(self, engine) -> bool:
+        return self._down_until.get(id(engine), 0.0) <= time.monotonic()
+
+    def pick(self):
+        if not self.replicas:
+            return self.primary
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                engine = self.replicas[next(self._cycle)]
+                if self.healthy(engine):
+                    return engine
+        return self.primary
+
+
+class RoutingSession(Session):
+    """A read session pinned to one engine chosen by ``router`` when it is created."""
+
+    def __init__(self, router: ReplicaRouter = None, **kwargs):
+        super().__init__(**kwargs)
+        self.routed_bind = router.pick() if router else None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.routed_bind is not None:
+            return self.routed_bind
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_begin")
+def _begin_statement_budget(session, transaction, connection):
+    session.info["dbapi_connection"] = connection.connection.dbapi_connection
+    timeout = session.info.get("statement_timeout")
+    if timeout and connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
+
+
+def statement_timeout(request) -> int:
+    route = request.scope.get("route")
+    return STATEMENT_TIMEOUTS.get(getattr(route, "path", None), DEFAULT_STATEMENT_TIMEOUT_MS)
+
+
+def cancel_query(session: Session):
+    """Cancel whatever the session's connection is running, from another thread."""
+    dbapi_connection = session.info.get("dbapi_connection")
+    if dbapi_connection is None:
+        return
+    if hasattr(dbapi_connection, "cancel"):  # psycopg2 / psycopg 3
+        dbapi_connection.cancel()
+    elif hasattr(dbapi_connection, "interrupt"):  # sqlite3
+        dbapi_connection.interrupt()
+
+
+async def cancel_on_disconnect(request, session: Session):
+    while not await request.is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL)
+    cancel_query(session)
+
+
+def is_query_canceled(exc) -> bool:
+    orig = getattr(exc, "orig", None)
+    return QUERY_CANCELED in (getattr(orig, "pgcode", None), getattr(orig, "sqlstate", None))
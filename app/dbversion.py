@@ -0,0 +1,95 @@
+"""Caching for data derived from DrugCentral, which only changes between releases."""
+import threading
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import Dbversion
+
+# bumped by expire_all(); a cache last checked under an older generation re-reads Dbversion
+_generation = 0
+
+
+def expire_all():
+    """Make every VersionedCache re-read Dbversion on its next ``get()``, instead of up to ``check_interval`` later."""
+    global _generation
+    _generation += 1
+
+
+def current_dbversion(db: Session):
+    return db.execute(select(func.max(Dbversion.version))).scalar()
+
+
+class VersionedCache:
+    """Holds a value built from the database and rebuilds it when Dbversion changes.
+
+    ``builder(db)`` is called on first use and whenever the release number moves
+    (as read by ``read_version(db)``, by default the newest Dbversion).
+    The version itself is only re-read every ``check_interval`` seconds, so
+    ``get()`` is a plain attribute read on the hot path. Database errors are
+    retried every ``retry_interval`` seconds, meanwhile serving the last value
+    built or re-raising the last error. ``expire_all()`` forces the next call
+    of every cache to re-check.
+    """
+
+    def __init__(self, builder, check_interval: float = 60.0, retry_interval: float = 5.0,
+                 read_version=current_dbversion):
+        self._builder = builder
+        self._read_version = read_version
+        self.check_interval = check_interval
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._value = None
+        self._error = None
+        self.version = None
+        self._checked_at = 0.0
+        self._generation = -1
+
+    def fresh(self) -> bool:
+        """True while ``get()`` can answer without touching the database."""
+        return (self._loaded and self._generation == _generation
+                and time.monotonic() - self._checked_at < self.check_interval)
+
+    def get(self):
+        if self.fresh():
+            return self._value
+        with self._lock:
+            if self.fresh():
+                return self._value
+            if self._error is not None and time.monotonic() - self._checked_at < self.retry_interval:
+                raise self._error
+            # taken before reading the version, so an expire_all() during the build is not lost
+            generation = _generation
+            db = SessionLocal()
+            try:
+                version = self._read_version(db)
+                if not self._loaded or version != self.version:
+                    self._value = self._builder(db)
+                    self.version = version
+                    self._loaded = True
+                self._error = None
+                self._checked_at = time.monotonic()
+                self._generation = generation
+            except SQLAlchemyError as e:
+                # a database that is down is retried every retry_interval, not on every call;
+                # a value that was already built keeps being served until then
+                if self._loaded:
+                    self._generation = generation
+                    self._checked_at = time.monotonic() - self.check_interval + self.retry_interval
+                    return self._value
+                self._error = e
+                self._checked_at = time.monotonic()
+                raise
+            finally:
+                db.close()
+        return self._value
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+            self._value = None
+            self._error = None
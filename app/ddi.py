@@ -0,0 +1,56 @@
+"""In-memory drug-drug interaction checker over ``ddi`` and ``struct2drgclass``."""
+from itertools import combinations, product
+from typing import Dict, FrozenSet, List, Set
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.dbversion import VersionedCache
+from app.models import Ddi, DrugClass, Struct2drgclass
+
+
+class DdiIndex:
+    def __init__(self, struct_classes: Dict[int, Set[str]], pairs: Dict[FrozenSet[str], List[dict]]):
+        self.struct_classes = struct_classes
+        self.pairs = pairs
+
+    def interactions(self, struct_a: int, struct_b: int) -> List[dict]:
+        found, seen = [], set()
+        for class_a, class_b in product(self.struct_classes.get(struct_a, ()),
+                                        self.struct_classes.get(struct_b, ())):
+            pair = frozenset((class_a, class_b))
+            if pair in seen:
+                continue
+            seen.add(pair)
+            for ddi in self.pairs.get(pair, ()):
+                found.append({"class1": class_a, "class2": class_b, **ddi})
+        return found
+
+    def check(self, drugs: List[dict]) -> List[dict]:
+        """``drugs`` is a list of {"input", "struct_ids"}; returns every pairwise interaction."""
+        results = []
+        for drug_a, drug_b in combinations(drugs, 2):
+            for struct_a, struct_b in product(drug_a["struct_ids"], drug_b["struct_ids"]):
+                if struct_a == struct_b:
+                    continue
+                for hit in self.interactions(struct_a, struct_b):
+                    results.append({"drug1": drug_a["input"], "struct_id1": struct_a,
+                                    "drug2": drug_b["input"], "struct_id2": struct_b, **hit})
+        return results
+
+
+def build_ddi_index(db: Session) -> DdiIndex:
+    struct_classes: Dict[int, Set[str]] = {}
+    for struct_id, name in db.execute(
+            select(Struct2drgclass.struct_id, DrugClass.name)
+            .join(DrugClass, DrugClass.id == Struct2drgclass.drug_class_id)):
+        struct_classes.setdefault(struct_id, set()).add(name)
+    pairs: Dict[FrozenSet[str], List[dict]] = {}
+    for class1, class2, risk, description, source_id in db.execute(
+            select(Ddi.drug_class1, Ddi.drug_class2, Ddi.ddi_risk, Ddi.description, Ddi.source_id)):
+        pairs.setdefault(frozenset((class1, class2)), []).append(
+            {"risk": risk, "description": description, "source_id": source_id})
+    return DdiIndex(struct_classes, pairs)
+
+
+ddi_index = VersionedCache(build_ddi_index)
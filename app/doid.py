@@ -0,0 +1,131 @@
+"""Disease Ontology lookups: terms, cross-references, hierarchy closure and drugs.
+
+DrugCentral's ``doid`` table has no is_a edges, so the hierarchy is read from
+the Disease Ontology OBO release named by ``DOID_OBO_PATH`` (e.g. ``doid.obo``
+from https://github.com/DiseaseOntology/HumanDiseaseOntology). Without it the
+term, xref and drug lookups still work and ancestors/descendants are empty.
+"""
+import os
+from typing import Dict, List, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.dbversion import VersionedCache
+from app.models import Doid, DoidXref, t_omop_relationship_doid_view
+
+DOID_OBO_PATH = os.environ.get("DOID_OBO_PATH", "")
+
+
+def normalize_doid(value: str) -> str:
+    value = value.strip().upper()
+    return f"DOID:{value}" if value.isdigit() else value
+
+
+def read_obo_parents(path: str) -> List[Tuple[str, str]]:
+    """(child, parent) is_a edges of the non-obsolete terms in an OBO file.
+
+    Only ``[Term]`` stanzas are read; ``[Typedef]`` is_a chains relate relations, not diseases.
+    """
+    edges = []
+    in_term, term, parents, obsolete = False, None, [], False
+
+    def flush():
+        if in_term and term and not obsolete:
+            edges.extend((term, parent) for parent in parents)
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("["):
+                flush()
+                in_term, term, parents, obsolete = line == "[Term]", None, [], False
+            elif not in_term:
+                continue
+            elif line.startswith("id: "):
+                term = line[4:].strip()
+            elif line.startswith("is_a: "):
+                parents.append(line[6:].split("!")[0].strip())
+            elif line == "is_obsolete: true":
+                obsolete = True
+    flush()
+    return edges
+
+
+def transitive_closure(edges: List[Tuple[str, str]]) -> Dict[str, Set[str]]:
+    """Ancestors of every term, memoised depth-first over the is_a DAG."""
+    parents: Dict[str, List[str]] = {}
+    for child, parent in edges:
+        parents.setdefault(child, []).append(parent)
+    ancestors: Dict[str, Set[str]] = {}
+
+    def visit(term, path=()):
+        if term in ancestors:
+            return ancestors[term]
+        result = set()
+        for parent in parents.get(term, ()):
+            if parent in path:  # guard against cycles in malformed files
+                continue
+            result.add(parent)
+            result |= visit(parent, path + (term,))
+        ancestors[term] = result
+        return result
+
+    for term in list(parents):
+        visit(term)
+    return ancestors
+
+
+class DoidIndex:
+    def __init__(self, terms: Dict[str, dict], xrefs: Dict[Tuple[str, str], List[str]],
+                 drugs: Dict[str, List[dict]], ancestors: Dict[str, Set[str]]):
+        self.terms = terms
+        self.xrefs = xrefs
+        self.drugs_by_doid = drugs
+        self.ancestors = {term: sorted(a) for term, a in ancestors.items()}
+        descendants: Dict[str, List[str]] = {}
+        for term, term_ancestors in self.ancestors.items():
+            for ancestor in term_ancestors:
+                descendants.setdefault(ancestor, []).append(term)
+        self.descendants = {term: sorted(d) for term, d in descendants.items()}
+        self.hierarchy_available = bool(ancestors)
+
+    def term(self, doid: str):
+        if doid not in self.terms:
+            return None
+        return {**self.terms[doid],
+                "ancestors": self.ancestors.get(doid, []),
+                "descendants": self.descendants.get(doid, []),
+                "hierarchy_available": self.hierarchy_available}
+
+    def lookup_xref(self, source: str, xref: str) -> List[dict]:
+        doids = self.xrefs.get((source.casefold(), xref.strip().casefold()), [])
+        return [self.terms.get(d, {"doid": d}) for d in doids]
+
+    def drugs(self, doid: str, include_descendants: bool = False) -> List[dict]:
+        doids = [doid] + (self.descendants.get(doid, []) if include_descendants else [])
+        return [dict(drug, doid=d) for d in doids for drug in self.drugs_by_doid.get(d, ())]
+
+
+def build_doid_index(db: Session) -> DoidIndex:
+    terms = {}
+    for pk, label, doid, url in db.execute(select(Doid.id, Doid.label, Doid.doid, Doid.url)):
+        if doid:
+            terms[doid] = {"id": pk, "doid": doid, "label": label, "url": url}
+    xrefs: Dict[Tuple[str, str], List[str]] = {}
+    for doid, source, xref in db.execute(select(DoidXref.doid, DoidXref.source, DoidXref.xref)):
+        if doid and source and xref:
+            xrefs.setdefault((source.casefold(), xref.strip().casefold()), []).append(doid)
+    view = t_omop_relationship_doid_view.c
+    drugs: Dict[str, List[dict]] = {}
+    for doid, struct_id, concept_id, relationship_name, concept_name in db.execute(
+            select(view.doid, view.struct_id, view.concept_id, view.relationship_name, view.concept_name)
+            .where(view.doid.is_not(None))):
+        drugs.setdefault(doid, []).append({"struct_id": struct_id, "concept_id": concept_id,
+                                           "relationship_name": relationship_name,
+                                           "concept_name": concept_name})
+    ancestors = transitive_closure(read_obo_parents(DOID_OBO_PATH)) if DOID_OBO_PATH else {}
+    return DoidIndex(terms, xrefs, drugs, ancestors)
+
+
+doid_index = VersionedCache(build_doid_index)
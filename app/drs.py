@@ -0,0 +1,340 @@
+"""GA4GH DRS objects for versioned DrugCentral table exports.
+
+``python -m app.drs`` writes one gzipped TSV per table under
+``DRS_EXPORT_DIR/<dbversion>/`` together with a ``manifest.json`` holding each
+file's size, sha256 and md5, so checksums are computed once per release rather
+than per request. Rebuilds are incremental: a table whose row count matches
+the previous manifest (same version, or the latest older one) has its rows
+hashed, in primary key order, without writing anything; if that fingerprint
+matches too the old file and checksums are kept, hard-linked across versions.
+Only changed tables are exported, fingerprinted in the same scan that writes
+them.
+
+Each version is also published as a bundle, ``drugcentral.<version>``,
+containing all of its table objects.
+"""
+import argparse
+import csv
+import datetime
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+
+from app.tables import DRUGCENTRAL_TABLES
+from app.models import Base
+
+DRS_EXPORT_DIR = os.environ.get("DRS_EXPORT_DIR", "exports")
+MANIFEST_NAME = "manifest.json"
+EXPORT_CHUNK = 10000
+READ_CHUNK = 1 << 20
+BULK_MAX_OBJECTS = 5000
+
+
+def object_id(version, table: str) -> str:
+    return f"drugcentral.{version}.{table}"
+
+
+def bundle_id(version) -> str:
+    return f"drugcentral.{version}"
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value).replace("\t", " ").replace("\r", " ").replace("\n", " ")
+
+
+def _chunks(db, table_name: str):
+    table = Base.metadata.tables[table_name]
+    yield [[c.name for c in table.columns]]
+    # a fixed row order keeps the file, and so its checksums, identical across rebuilds
+    order = list(table.primary_key.columns) or list(table.columns)
+    result = db.execute(select(table).order_by(*order).execution_options(yield_per=EXPORT_CHUNK))
+    for chunk in result.partitions():
+        yield [[_cell(v) for v in row] for row in chunk]
+
+
+def _hash_rows(digest, chunk):
+    for row in chunk:
+        digest.update("\t".join(row).encode("utf-8"))
+        digest.update(b"\n")
+
+
+def table_fingerprint(db, table_name: str):
+    """(rows, fingerprint) as ``export_table`` would return them, without writing the file."""
+    rows = -1  # header
+    digest = hashlib.sha256()
+    for chunk in _chunks(db, table_name):
+        _hash_rows(digest, chunk)
+        rows += len(chunk)
+    return rows, digest.hexdigest()
+
+
+def export_table(db, table_name: str, path: str):
+    """Write the table to ``path``; returns (rows, fingerprint), the sha256 over the exported cells."""
+    rows = -1  # header
+    digest = hashlib.sha256()
+    # mtime=0 keeps the gzip bytes, and so the checksums, stable across rebuilds
+    with open(path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as gz:
+        text = io.TextIOWrapper(gz, encoding="utf-8", newline="")
+        writer = csv.writer(text, delimiter="\t", lineterminator="\n")
+        for chunk in _chunks(db, table_name):
+            writer.writerows(chunk)
+            _hash_rows(digest, chunk)
+            rows += len(chunk)
+        text.flush()
+        text.detach()
+    return rows, digest.hexdigest()
+
+
+def checksum_file(path: str) -> Dict[str, str]:
+    sha256, md5 = hashlib.sha256(), hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(READ_CHUNK), b""):
+            sha256.update(block)
+            md5.update(block)
+    return {"sha-256": sha256.hexdigest(), "md5": md5.hexdigest()}
+
+
+def read_manifest(version_dir: str) -> dict:
+    path = os.path.join(version_dir, MANIFEST_NAME)
+    if not os.path.isfile(path):
+        return {"objects": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _previous_entries(export_dir: str, version) -> Dict[str, dict]:
+    """Table entries of the newest manifest older than ``version``, with their file paths."""
+    older = []
+    if os.path.isdir(export_dir):
+        for name in os.listdir(export_dir):
+            if name.isdigit() and int(name) < int(version):
+                older.append(int(name))
+    if not older:
+        return {}
+    version_dir = os.path.join(export_dir, str(max(older)))
+    return {entry["table"]: dict(entry, file=os.path.join(version_dir, entry["path"]))
+            for entry in read_manifest(version_dir)["objects"].values()}
+
+
+def build_exports(db, version, export_dir: str = DRS_EXPORT_DIR, tables=None, force: bool = False) -> dict:
+    """Export ``tables`` (default: all) and merge them into the version's manifest.
+
+    Tables whose row count and fingerprint are unchanged are skipped (same
+    version) or linked from the previous version's export, unless ``force``
+    is set.
+    """
+    version_dir = os.path.join(export_dir, str(version))
+    os.makedirs(version_dir, exist_ok=True)
+    objects = read_manifest(version_dir)["objects"]
+    previous = _previous_entries(export_dir, version)
+    for table_name in tables or DRUGCENTRAL_TABLES:
+        filename = f"{table_name}.tsv.gz"
+        path = os.path.join(version_dir, filename)
+        oid = object_id(version, table_name)
+        current, prior = objects.get(oid), previous.get(table_name)
+        if current and not os.path.isfile(path):
+            current = None
+        if prior and not os.path.isfile(prior["file"]):
+            prior = None
+        if not force and (current or prior):
+            # a count is cheap and rules out most changed tables; equal counts still need the row hash
+            count = db.execute(select(func.count()).select_from(Base.metadata.tables[table_name])).scalar()
+            candidates = [e for e in (current, prior) if e and e.get("rows") == count and e.get("fingerprint")]
+            if candidates:
+                fingerprint = table_fingerprint(db, table_name)[1]
+                if current in candidates and current["fingerprint"] == fingerprint:
+                    continue
+                if prior in candidates and prior["fingerprint"] == fingerprint:
+                    if os.path.exists(path):
+                        os.remove(path)
+                    os.link(prior["file"], path)
+                    objects[oid] = dict({k: v for k, v in prior.items() if k != "file"}, id=oid,
+                                        version=str(version))
+                    continue
+        # the file written is fingerprinted in the same scan, and only replaces the old one when complete
+        tmp = path + ".tmp"
+        rows, fingerprint = export_table(db, table_name, tmp)
+        os.replace(tmp, path)
+        objects[oid] = {
+            "id": oid,
+            "name": filename,
+            "table": table_name,
+            "version": str(version),
+            "rows": rows,
+            "size": os.path.getsize(path),
+            "checksums": checksum_file(path),
+            "fingerprint": fingerprint,
+            "created_time": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "mime_type": "application/gzip",
+            "path": filename,
+        }
+    manifest = {"version": str(version), "objects": objects}
+    # a running DrsIndex may reload the manifest at any time, so it is swapped in whole
+    path = os.path.join(version_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(path + ".tmp", path)
+    return manifest
+
+
+def bundle_checksums(entries: List[dict]) -> Dict[str, str]:
+    """DRS bundle checksum: digest of the members' checksums, sorted and concatenated."""
+    out = {}
+    for kind, factory in (("sha-256", hashlib.sha256), ("md5", hashlib.md5)):
+        out[kind] = factory("".join(sorted(e["checksums"][kind] for e in entries)).encode()).hexdigest()
+    return out
+
+
+class DrsIndex:
+    """Every export manifest under ``export_dir`` plus one bundle per version, keyed by id."""
+
+    def __init__(self, export_dir: str = DRS_EXPORT_DIR, check_interval: float = 60.0):
+        self.export_dir = export_dir
+        self.check_interval = check_interval
+        self.objects: Dict[str, dict] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        """Re-read only the manifests that changed since the last load."""
+        objects = dict(self.objects)
+        versions = set()
+        if os.path.isdir(self.export_dir):
+            versions = {v for v in os.listdir(self.export_dir)
+                        if os.path.isfile(os.path.join(self.export_dir, v, MANIFEST_NAME))}
+        for version in set(self._mtimes) | versions:
+            version_dir = os.path.join(self.export_dir, version)
+            mtime = os.path.getmtime(os.path.join(version_dir, MANIFEST_NAME)) if version in versions else None
+            if mtime is not None and self._mtimes.get(version) == mtime:
+                continue
+            if mtime is not None:
+                try:
+                    manifest = read_manifest(version_dir)
+                except ValueError:
+                    continue  # unreadable; keep the version's previous entries
+            objects = {oid: e for oid, e in objects.items() if e["version"] != version}
+            self._mtimes.pop(version, None)
+            if mtime is None:
+                continue
+            members = []
+            for oid, entry in manifest["objects"].items():
+                objects[oid] = dict(entry, file=os.path.join(version_dir, entry["path"]))
+                members.append(objects[oid])
+            bid = bundle_id(version)
+            objects[bid] = {
+                "id": bid, "name": f"drugcentral-{version}", "version": version, "bundle": True,
+                "size": sum(e["size"] for e in members),
+                "created_time": max((e["created_time"] for e in members), default=None),
+                "checksums": bundle_checksums(members),
+                # member names are kept here so a bundle never looks up entries a later reload may drop
+                "contents": sorted((e["id"], e["name"]) for e in members),
+            }
+            self._mtimes[version] = mtime
+        self.objects = objects
+        self._checked = time.monotonic()
+
+    def refresh(self) -> Dict[str, dict]:
+        """The current objects, picking up new manifests at most every ``check_interval`` seconds."""
+        if time.monotonic() - self._checked >= self.check_interval:
+            with self._lock:
+                if time.monotonic() - self._checked >= self.check_interval:
+                    self.reload()
+        return self.objects
+
+    def get(self, oid: str) -> Optional[dict]:
+        return self.refresh().get(oid)
+
+
+def drs_object(entry: dict, base_url: str) -> dict:
+    host = base_url.split("://", 1)[-1].rstrip("/")
+    if entry.get("bundle"):
+        contents = [{"name": name, "id": oid, "drs_uri": [f"drs://{host}/{oid}"]}
+                    for oid, name in entry["contents"]]
+        return {
+            "id": entry["id"],
+            "name": entry["name"],
+            "self_uri": f"drs://{host}/{entry['id']}",
+            "size": entry["size"],
+            "created_time": entry["created_time"],
+            "version": entry["version"],
+            "description": f"All exported DrugCentral tables for version {entry['version']}",
+            "checksums": [{"type": t, "checksum": c} for t, c in entry["checksums"].items()],
+            "contents": contents,
+        }
+    return {
+        "id": entry["id"],
+        "name": entry["name"],
+        "self_uri": f"drs://{host}/{entry['id']}",
+        "size": entry["size"],
+        "created_time": entry["created_time"],
+        "version": entry["version"],
+        "mime_type": entry["mime_type"],
+        "description": f"DrugCentral table {entry['table']} ({entry['rows']} rows), gzipped TSV",
+        "checksums": [{"type": t, "checksum": c} for t, c in entry["checksums"].items()],
+        "access_methods": [{"type": "https", "access_id": "https"}],
+    }
+
+
+def parse_range(header: str, size: int):
+    """(start, end) inclusive for a single ``bytes=`` range, or None if unsatisfiable.
+
+    Raises ValueError for a range the server ignores: malformed, multiple
+    ranges, or a last position before the first.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        raise ValueError("only single byte ranges are supported")
+    start, _, end = spec.strip().partition("-")
+    if not start:
+        length = int(end)
+        if length <= 0:
+            return None
+        return max(size - length, 0), size - 1
+    start = int(start)
+    if end and int(end) < start:
+        raise ValueError("invalid byte range")
+    if start >= size:
+        return None
+    return start, min(int(end), size - 1) if end else size - 1
+
+
+def iter_file(path: str, start: int, end: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            block = f.read(min(READ_CHUNK, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+    from app.dbversion import current_dbversion
+
+    parser = argparse.ArgumentParser(description="Build versioned DrugCentral exports for the DRS API")
+    parser.add_argument("tables", nargs="*", help="tables to export (default: all DrugCentral tables)")
+    parser.add_argument("--out", default=DRS_EXPORT_DIR, help="export directory")
+    parser.add_argument("--force", action="store_true", help="re-export tables even if unchanged")
+    args = parser.parse_args()
+    db = SessionLocal()
+    try:
+        manifest = build_exports(db, current_dbversion(db), args.out, args.tables, force=args.force)
+    finally:
+        db.close()
+    print(f"exported {len(manifest['objects'])} tables for version {manifest['version']}")
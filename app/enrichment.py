@@ -0,0 +1,109 @@
+"""GO / UniProt keyword over-representation analysis for target component sets.
+
+Each mode keeps a component x term incidence matrix; a query is one sparse
+row-sum plus vectorized hypergeometric tails and Benjamini-Hochberg FDR.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy import sparse
+from scipy.stats import hypergeom
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.dbversion import VersionedCache
+from app.models import Td2tc, Tdgo2tc, Tdkey2tc, TargetGo, TargetKeyword
+
+MODES = ("go", "keyword")
+
+
+class Incidence:
+    def __init__(self, pairs, terms: Dict[str, dict]):
+        component_ids = sorted({c for c, _ in pairs})
+        term_ids = sorted({t for _, t in pairs})
+        self.component_index = {c: i for i, c in enumerate(component_ids)}
+        self.term_ids = term_ids
+        self.terms = [terms.get(t, {}) for t in term_ids]
+        term_index = {t: i for i, t in enumerate(term_ids)}
+        rows = np.array([self.component_index[c] for c, _ in pairs], dtype=np.int64)
+        cols = np.array([term_index[t] for _, t in pairs], dtype=np.int64)
+        matrix = sparse.csr_matrix((np.ones(len(pairs), dtype=np.int32), (rows, cols)),
+                                   shape=(len(component_ids), len(term_ids)))
+        matrix.data[:] = 1  # collapse duplicate links
+        self.matrix = matrix
+        self.term_totals = np.asarray(matrix.sum(axis=0)).ravel()
+
+    @property
+    def universe(self):
+        return self.matrix.shape[0]
+
+
+def benjamini_hochberg(p: np.ndarray) -> np.ndarray:
+    n = len(p)
+    if not n:
+        return p
+    order = np.argsort(p)
+    scaled = p[order] * n / np.arange(1, n + 1)
+    fdr = np.minimum.accumulate(scaled[::-1])[::-1]
+    out = np.empty(n)
+    out[order] = np.minimum(fdr, 1.0)
+    return out
+
+
+class EnrichmentIndex:
+    def __init__(self, incidences: Dict[str, Incidence], target_components: Dict[int, List[int]]):
+        self.incidences = incidences
+        self.target_components = target_components
+
+    def enrich(self, mode: str, target_ids: List[int], component_ids: List[int],
+               term_type: Optional[str] = None, min_count: int = 1):
+        incidence = self.incidences[mode]
+        components = set(component_ids)
+        for target_id in target_ids:
+            components.update(self.target_components.get(target_id, ()))
+        rows = sorted(incidence.component_index[c] for c in components if c in incidence.component_index)
+        n, N = len(rows), incidence.universe
+        if not n:
+            return {"mode": mode, "query_size": 0, "universe": N, "results": []}
+
+        hits = np.asarray(incidence.matrix[rows].sum(axis=0)).ravel()
+        # the tested family is every term of the chosen type with a hit; min_count only
+        # filters what is reported, so it cannot change the FDR of the terms it keeps
+        tested = hits >= 1
+        if term_type:
+            tested &= np.array([t.get("type") == term_type for t in incidence.terms])
+        idx = np.flatnonzero(tested)
+        k, K = hits[idx], incidence.term_totals[idx]
+        pvalues = hypergeom.sf(k - 1, N, K, n)
+        fdr = benjamini_hochberg(pvalues)
+        order = [i for i in np.argsort(pvalues, kind="stable") if k[i] >= min_count]
+        results = [{
+            "term_id": incidence.term_ids[idx[i]],
+            **incidence.terms[idx[i]],
+            "count": int(k[i]),
+            "term_size": int(K[i]),
+            "fold_enrichment": float(k[i] * N / (n * K[i])),
+            "p_value": float(pvalues[i]),
+            "fdr": float(fdr[i]),
+        } for i in order]
+        return {"mode": mode, "query_size": n, "universe": N, "results": results}
+
+
+def build_enrichment_index(db: Session) -> EnrichmentIndex:
+    go_terms = {go_id.strip(): {"name": term, "type": go_type}
+                for go_id, term, go_type in db.execute(select(TargetGo.id, TargetGo.term, TargetGo.type))}
+    keywords = {kw_id.strip(): {"name": keyword, "type": category}
+                for kw_id, keyword, category in db.execute(
+                    select(TargetKeyword.id, TargetKeyword.keyword, TargetKeyword.category))}
+    go_pairs = [(c, t.strip()) for c, t in db.execute(
+        select(Tdgo2tc.component_id, Tdgo2tc.go_id).where(Tdgo2tc.component_id.is_not(None)))]
+    kw_pairs = [(c, t.strip()) for c, t in db.execute(
+        select(Tdkey2tc.component_id, Tdkey2tc.tdkey_id).where(Tdkey2tc.component_id.is_not(None)))]
+    target_components: Dict[int, List[int]] = {}
+    for target_id, component_id in db.execute(select(Td2tc.target_id, Td2tc.component_id)):
+        target_components.setdefault(target_id, []).append(component_id)
+    return EnrichmentIndex({"go": Incidence(go_pairs, go_terms), "keyword": Incidence(kw_pairs, keywords)},
+                           target_components)
+
+
+enrichment_index = VersionedCache(build_enrichment_index)
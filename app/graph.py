@@ -0,0 +1,101 @@
+"""CSR adjacency index over the drug - target - component - GO/keyword link tables."""
+from typing import Dict, List, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.dbversion import VersionedCache
+from app.models import ActTableFull, Td2tc, Tdgo2tc, Tdkey2tc
+
+NODE_TYPES = ("struct", "target", "component", "go", "keyword")
+
+
+class NodeIds:
+    """Dense 0..n-1 numbering for the external ids of one node type."""
+
+    def __init__(self, ids):
+        self.ids = np.array(sorted(set(ids)), dtype=object)
+        self.index = {node_id: i for i, node_id in enumerate(self.ids.tolist())}
+
+
+class Csr:
+    def __init__(self, src: np.ndarray, dst: np.ndarray, n_src: int):
+        order = np.lexsort((dst, src))
+        src, dst = src[order], dst[order]
+        keep = np.ones(len(src), dtype=bool)
+        keep[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+        src, dst = src[keep], dst[keep]
+        self.indptr = np.zeros(n_src + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n_src), out=self.indptr[1:])
+        self.indices = dst.astype(np.int32)
+
+    def expand(self, frontier: np.ndarray) -> np.ndarray:
+        """Unique neighbours of every node in ``frontier``."""
+        starts = self.indptr[frontier]
+        lengths = self.indptr[frontier + 1] - starts
+        total = int(lengths.sum())
+        if not total:
+            return np.empty(0, dtype=np.int64)
+        offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        return np.unique(self.indices[offsets + np.arange(total)])
+
+
+class GraphIndex:
+    def __init__(self, edges: Dict[Tuple[str, str], List[tuple]]):
+        ids = {t: [] for t in NODE_TYPES}
+        for (src_type, dst_type), pairs in edges.items():
+            ids[src_type].extend(p[0] for p in pairs)
+            ids[dst_type].extend(p[1] for p in pairs)
+        self.nodes = {t: NodeIds(v) for t, v in ids.items()}
+        self.adjacency: Dict[Tuple[str, str], Csr] = {}
+        for (src_type, dst_type), pairs in edges.items():
+            src_index, dst_index = self.nodes[src_type].index, self.nodes[dst_type].index
+            src = np.array([src_index[p[0]] for p in pairs], dtype=np.int64)
+            dst = np.array([dst_index[p[1]] for p in pairs], dtype=np.int64)
+            self.adjacency[(src_type, dst_type)] = Csr(src, dst, len(self.nodes[src_type].ids))
+            self.adjacency[(dst_type, src_type)] = Csr(dst, src, len(self.nodes[dst_type].ids))
+
+    def parse_node(self, node: str):
+        node_type, _, node_id = node.partition(":")
+        if node_type not in self.nodes or not node_id:
+            raise ValueError(f"invalid node {node!r}, expected <type>:<id> with type in {NODE_TYPES}")
+        if node_type not in ("go", "keyword"):
+            node_id = int(node_id)
+        return node_type, node_id
+
+    def neighbors(self, sources: List[str], path: List[str]):
+        """Follow ``path`` from every source node; returns de-duplicated end nodes."""
+        parsed = [self.parse_node(s) for s in sources]
+        types = {t for t, _ in parsed}
+        if len(types) != 1:
+            raise ValueError("all from nodes must have the same type")
+        current = types.pop()
+        index = self.nodes[current].index
+        frontier = np.unique(np.array([index[i] for _, i in parsed if i in index], dtype=np.int64))
+        for hop in path:
+            if (current, hop) not in self.adjacency:
+                raise ValueError(f"no edge from {current} to {hop}")
+            frontier = self.adjacency[(current, hop)].expand(frontier)
+            current = hop
+        return current, self.nodes[current].ids[frontier].tolist()
+
+
+def build_graph_index(db: Session) -> GraphIndex:
+    edges = {
+        ("struct", "target"): db.execute(
+            select(ActTableFull.struct_id, ActTableFull.target_id).distinct()).all(),
+        ("target", "component"): db.execute(
+            select(Td2tc.target_id, Td2tc.component_id)).all(),
+        ("component", "go"): db.execute(
+            select(Tdgo2tc.component_id, Tdgo2tc.go_id).where(Tdgo2tc.component_id.is_not(None))).all(),
+        ("component", "keyword"): db.execute(
+            select(Tdkey2tc.component_id, Tdkey2tc.tdkey_id).where(Tdkey2tc.component_id.is_not(None))).all(),
+    }
+    # CHAR columns come back blank-padded
+    for key in (("component", "go"), ("component", "keyword")):
+        edges[key] = [(c, term.strip()) for c, term in edges[key]]
+    return GraphIndex(edges)
+
+
+graph_index = VersionedCache(build_graph_index)
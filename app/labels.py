@@ -0,0 +1,89 @@
+"""Full-text search over FDA drug label sections.
+
+The search column is a generated ``tsvector`` on ``section`` with a GIN index,
+created once with ``python -m app.labels``.
+"""
+import base64
+import json
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+SEARCH_DDL = [
+    "ALTER TABLE section ADD COLUMN IF NOT EXISTS search_tsv tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(text, '')), 'B')"
+    ") STORED",
+    "CREATE INDEX IF NOT EXISTS section_search_tsv_idx ON section USING gin (search_tsv)",
+]
+
+HEADLINE_OPTIONS = "StartSel=<b>, StopSel=</b>, MaxFragments=2, MaxWords=35, MinWords=15"
+
+SEARCH_SQL = """
+SELECT hit.id, hit.label_id, hit.code, hit.title, hit.rank,
+       l.title AS label_title, l.category, l.effective_date,
+       ts_headline('english', s.text, websearch_to_tsquery('english', :q), :headline) AS snippet
+FROM (
+    SELECT s.id, s.label_id, s.code, s.title, ts_rank(s.search_tsv, query) AS rank
+    FROM section s, websearch_to_tsquery('english', :q) query
+    WHERE s.search_tsv @@ query
+      {section_filter}
+) hit
+JOIN section s ON s.id = hit.id
+LEFT JOIN label l ON l.id = hit.label_id
+{cursor_filter}
+ORDER BY hit.rank DESC, hit.id DESC
+LIMIT :limit
+"""
+
+
+def create_search_index(engine):
+    with engine.begin() as conn:
+        for stmt in SEARCH_DDL:
+            conn.execute(text(stmt))
+
+
+def encode_cursor(rank: float, section_id: int) -> str:
+    raw = json.dumps([rank, section_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str):
+    """Return (rank, section_id) from an opaque cursor, or raise ValueError."""
+    try:
+        rank, section_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), int(section_id)
+    except Exception as e:
+        raise ValueError("invalid cursor") from e
+
+
+def search_sections(db: Session, q: str, section: Optional[str] = None,
+                    cursor: Optional[str] = None, limit: int = 10):
+    """Rank label sections matching ``q``; returns (rows, next_cursor)."""
+    params = {"q": q, "limit": limit, "headline": HEADLINE_OPTIONS}
+    section_filter = ""
+    if section:
+        section_filter = "AND (s.code = :section OR s.title ILIKE :section_pattern)"
+        params["section"] = section
+        params["section_pattern"] = f"%{section}%"
+    cursor_filter = ""
+    if cursor:
+        params["cursor_rank"], params["cursor_id"] = decode_cursor(cursor)
+        cursor_filter = ("WHERE hit.rank < CAST(:cursor_rank AS real) "
+                         "OR (hit.rank = CAST(:cursor_rank AS real) AND hit.id < :cursor_id)")
+
+    sql = SEARCH_SQL.format(section_filter=section_filter, cursor_filter=cursor_filter)
+    rows = [dict(row) for row in db.execute(text(sql), params).mappings()]
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = encode_cursor(rows[-1]["rank"], rows[-1]["id"])
+    return rows, next_cursor
+
+
+if __name__ == "__main__":
+    from app.database import engine
+
+    create_search_index(engine)
+    print("section.search_tsv and section_search_tsv_idx are in place")
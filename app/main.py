@@ -1,670 +1,443 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
-from app.models import ActTableFull
-from app.models import Structures
-from app.models import Identifier
-from app.models import IdType
-from app.models import Synonyms
-from app.models import TargetClass
-from app.models import TargetComponent
-from app.models import TargetDictionary
-from app.models import TargetGo
-from app.models import TargetKeyword
-from app.models import Td2tc
-from app.models import Tdgo2tc
-from app.models import Tdkey2tc
-from app.models import OmopRelationship
-from app.models import Product
-from app.models import Struct2obprod
-from app.models import Atc
-from app.models import Struct2atc
-from app.models import DrugClass
-from app.models import Doid
-from app.database import SessionLocal
+from app.database import DRUGCENTRAL_SNAPSHOT, ReadSessionLocal, engine, replicas
+from app import db_routing
+from app import labels
+from app.autocomplete import prefix_index
+from app.resolver import resolver_index
+from app.schemas import ResolveBatchRequest, EnrichmentRequest, DdiCheckRequest, DrsBulkRequest
+from app import structure_filter
+from app.structure_filter import structure_columns
+from app.property_matrix import property_matrix
+from app import activity_matrix
+from app.activity_summary import activity_summaries
+from app.graph import graph_index
+from app.enrichment import enrichment_index
+from app.ddi import ddi_index
+from app.atc_tree import atc_tree
+from app.doid import doid_index, normalize_doid
+from app import search as unified_search
+from app.orangebook import orangebook_index, KINDS as ORANGEBOOK_KINDS
+from app.approvals import approval_summaries
+from app import drs
+from app.table_routes import register_table_routes
+from app.conditional import ConditionalGetMiddleware, release
+from app.compression import CompressionMiddleware
+from app import profiler
 from urllib.parse import unquote
-from sqlalchemy import func
-from typing import List
+from typing import List, Optional
+import asyncio
+import datetime
+import hmac
+import os
 
 app = FastAPI(title="DrugCentral DRS API")
-
-def get_db():
-    db = SessionLocal()
+app.add_middleware(profiler.RouteContextMiddleware)
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(CompressionMiddleware)
+drs_index = drs.DrsIndex()
+profiler.install(engine, *replicas)
+
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+async def get_db(request: Request):
+    # read sessions go to a healthy replica, under the route's statement timeout,
+    # and their query is cancelled if the client goes away
+    db = ReadSessionLocal()
+    db.info["statement_timeout"] = db_routing.statement_timeout(request)
+    watcher = asyncio.create_task(db_routing.cancel_on_disconnect(request, db))
     try:
         yield db
     finally:
-        db.close()
+        watcher.cancel()
+        # closing rolls back and returns the connection, which blocks: keep it off the event loop
+        await run_in_threadpool(db.close)
+
+@app.exception_handler(OperationalError)
+def database_unavailable(request: Request, exc: OperationalError):
+    if db_routing.is_query_canceled(exc):
+        return JSONResponse(status_code=503, content={"detail": "query exceeded its time budget"})
+    return JSONResponse(status_code=503, content={"detail": "database unavailable"})
+
+@app.on_event("startup")
+def warm_caches():
+    release.get()
+    prefix_index.get()
+    resolver_index.get()
+    structure_columns.get()
+    property_matrix.get()
+    activity_summaries.get()
+    graph_index.get()
+    enrichment_index.get()
+    ddi_index.get()
+    atc_tree.get()
+    doid_index.get()
+    orangebook_index.get()
+    approval_summaries.get()
 
 # check if server is running ok
 @app.get("/")
 def root():
     return {"status": "ok"}
 
-# TABLE 1:  act_table_full
-@app.get("/act_table_full")
-def read_doid(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return db.query(ActTableFull).offset(skip).limit(limit).all()
-
-@app.get("/act_table_full/act_id/{act_id}")
-def read_act_table_full_by_act_id(act_id: int, db: Session = Depends(get_db)):
-    result = db.query(ActTableFull).filter(ActTableFull.act_id == act_id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="act_id not found")
-    return result
-
-@app.get("/act_table_full/struct_id/{struct_id}")
-def read_act_table_full_by_struct_id(struct_id: int, db: Session = Depends(get_db)):
-    result = db.query(ActTableFull).filter(ActTableFull.struct_id == struct_id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="struct_id not found")
-    return result
-
-@app.get("/act_table_full/target_class/{target_class}")
-def read_act_table_full_by_target_class(target_class: str, db: Session = Depends(get_db)):
-    decoded_target_class = unquote(target_class)
-    result = db.query(ActTableFull).filter(func.trim(ActTableFull.target_class).ilike(f"%{decoded_target_class}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="target_class not found")
-    return result
-
-@app.get("/act_table_full/accession/{accession}")
-def read_act_table_full_by_accession(accession: str, db: Session = Depends(get_db)):
-    decoded_accession = unquote(accession)
-    result = db.query(ActTableFull).filter(func.trim(ActTableFull.accession).ilike(f"%{decoded_accession}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="accession not found")
-    return result
-
-@app.get("/act_table_full/gene/{gene}")
-def read_act_table_full_by_gene(gene: str, db: Session = Depends(get_db)):
-    decoded_gene = unquote(gene)
-    result = db.query(ActTableFull).filter(func.trim(ActTableFull.gene).ilike(f"%{decoded_gene}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="gene not found")
-    return result
-
-@app.get("/act_table_full/swissprot/{swissprot}")
-def read_act_table_full_by_swissprot(swissprot: str, db: Session = Depends(get_db)):
-    decoded_swissprot = unquote(swissprot)
-    result = db.query(ActTableFull).filter(func.trim(ActTableFull.swissprot).ilike(f"%{decoded_swissprot}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="swissprot not found")
-    return result
-
-@app.get("/act_table_full/act_type/{act_type}")
-def read_act_table_full_by_act_type(act_type: str, db: Session = Depends(get_db)):
-    decoded_act_type = unquote(act_type)
-    result = db.query(ActTableFull).filter(func.trim(ActTableFull.act_type).ilike(f"%{decoded_act_type}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="act_type not found")
-    return result
-
-@app.get("/act_table_full/organism/{organism}")
-def read_act_table_full_by_organism(organism: str, db: Session = Depends(get_db)):
-    decoded_organism = unquote(organism)
-    result = db.query(ActTableFull).filter(func.trim(ActTableFull.organism).ilike(f"%{decoded_organism}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="organism not found")
-    return result
+# Table listings and lookups (/<table>, /<table>/<column>/{value}), generated from
+# the registry in app/table_routes.py
+register_table_routes(app, get_db)
 
 
-# TABLE 2:  structures
-@app.get("/structures")
-def read_structures(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return db.query(Structures).offset(skip).limit(limit).all()
-
-@app.get("/structures/cd_id/{cd_id}")
-def read_structures_by_cd_id(cd_id: int, db: Session = Depends(get_db)):
-    result = db.query(Structures).filter(Structures.cd_id == cd_id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="cd_id not found")
-    return result
-
-@app.get("/structures/id/{id}")
-def read_structures_by_id(id: int, db: Session = Depends(get_db)):
-    result = db.query(Structures).filter(Structures.id == id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="id not found")
-    return result
-
-@app.get("/structures/name/{name}")
-def read_structures_by_name(name: str, db: Session = Depends(get_db)):
-    decoded_name = unquote(name)
-    result = db.query(Structures).filter(func.trim(Structures.name).ilike(f"%{decoded_name}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="name not found")
-    return result
-
-@app.get("/structures/smiles/{smiles}")
-def read_structures_by_smiles(smiles: str, db: Session = Depends(get_db)):
-    decoded_smiles = unquote(smiles)
-    result = db.query(Structures).filter(func.trim(Structures.smiles).ilike(f"%{decoded_smiles}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="smiles not found")
-    return result
-
-@app.get("/structures/inchikey/{inchikey}")
-def read_structures_by_inchikey(inchikey: str, db: Session = Depends(get_db)):
-    decoded_inchikey = unquote(inchikey)
-    result = db.query(Structures).filter(func.trim(Structures.inchikey).ilike(f"%{decoded_inchikey}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="inchikey not found")
-    return result
-
-
-# TABLE 3:  Identifier
-@app.get("/identifier")
-def read_identifier(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return db.query(Identifier).offset(skip).limit(limit).all()
-
-@app.get("/identifier/id/{id}")
-def read_identifier_by_id(id: int, db: Session = Depends(get_db)):
-    result = db.query(Identifier).filter(Identifier.id == id).all()
-    if not result:
+# Drug label full-text search (run `python -m app.labels` once to build the index)
+@app.get("/labels/search")
+def search_labels(q: str, section: Optional[str] = None, cursor: Optional[str] = None, limit: int = 10, db: Session = Depends(get_db)):
+    if DRUGCENTRAL_SNAPSHOT:
+        raise HTTPException(status_code=501, detail="label search needs the Postgres database, not a snapshot")
+    limit = max(1, min(limit, 100))
+    try:
+        results, next_cursor = labels.search_sections(db, q, section=section, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not results and not cursor:
+        raise HTTPException(status_code=404, detail="no label sections match q")
+    return {"results": results, "next_cursor": next_cursor}
+
+
+# Typeahead over structure names, synonyms and product names (served from memory)
+@app.get("/autocomplete")
+def autocomplete(q: str, limit: int = 10):
+    limit = max(1, min(limit, 100))
+    completions = prefix_index.get().complete(q, limit)
+    return [{"name": c.name, "struct_id": c.struct_id, "source": c.source} for c in completions]
+
+
+# Resolve any external identifier, CAS number, InChIKey or synonym to struct_ids
+@app.get("/resolve")
+def resolve(id: str):
+    matches = resolver_index.get().resolve(id)
+    if not matches:
         raise HTTPException(status_code=404, detail="id not found")
-    return result
-
-@app.get("/identifier/identifier/{identifier}")
-def read_identifier_by_identifier(identifier: str, db: Session = Depends(get_db)):
-    decoded_identifier = unquote(identifier)
-    result = db.query(Identifier).filter(func.trim(Identifier.identifier).ilike(f"%{decoded_identifier}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="identifier not found")
-    return result
-
-@app.get("/identifier/id_type/{id_type}")
-def read_identifier_by_id_type(id_type: str, db: Session = Depends(get_db)):
-    decoded_id_type = unquote(id_type)
-    result = db.query(Identifier).filter(func.trim(Identifier.id_type).ilike(f"%{decoded_id_type}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="id_type not found")
-    return result
-
-@app.get("/identifier/struct_id/{struct_id}")
-def read_identifier_by_struct_id(struct_id: int, db: Session = Depends(get_db)):
-    result = db.query(Identifier).filter(Identifier.struct_id == struct_id).all()
-    if not result:
+    return {"id": id, "matches": matches}
+
+@app.post("/resolve/batch")
+def resolve_batch(request: ResolveBatchRequest):
+    index = resolver_index.get()
+    return [{"id": id, "matches": index.resolve(id)} for id in request.ids]
+
+
+# Numeric property screens over structures, e.g. /structures/filter?mw=100..500&clogp=..5
+@app.get("/structures/filter")
+def filter_structures(request: Request, preset: Optional[str] = None, fields: Optional[str] = None,
+                      skip: int = Query(0, ge=0), limit: int = Query(1000, ge=1)):
+    ranges = {}
+    if preset:
+        if preset not in structure_filter.PRESETS:
+            raise HTTPException(status_code=400, detail=f"unknown preset, expected one of {sorted(structure_filter.PRESETS)}")
+        ranges.update(structure_filter.PRESETS[preset])
+    for param, value in request.query_params.items():
+        if param in ("preset", "fields", "skip", "limit"):
+            continue
+        if param not in structure_filter.FILTER_COLUMNS:
+            raise HTTPException(status_code=400, detail=f"unknown filter: {param}")
+        try:
+            ranges[param] = structure_filter.parse_range(value)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    columns = structure_columns.get()
+    indices = columns.mask(ranges).nonzero()[0]
+    page = indices[skip:skip + limit]
+    if not fields:
+        return {"total": int(len(indices)), "ids": columns.ids[page].tolist()}
+    field_list = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in field_list if f != "name" and f not in structure_filter.FILTER_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"unknown fields: {unknown}")
+    return {"total": int(len(indices)), "results": columns.project(page, field_list)}
+
+
+# Pivoted physchem properties (property + pka tables), one wide row per struct_id
+@app.get("/properties/columns")
+def read_property_columns():
+    return property_matrix.get().columns
+
+@app.get("/properties/matrix")
+def download_property_matrix(format: str = "npz"):
+    matrix = property_matrix.get()
+    if format not in ("npz", "arrow"):
+        raise HTTPException(status_code=400, detail="format must be npz or arrow")
+    try:
+        content = matrix.export(format)
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    filename = f"drugcentral_properties_{property_matrix.version}.{format}"
+    return Response(content=content, media_type="application/octet-stream",
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+@app.get("/properties/{struct_id}")
+def read_properties_by_struct_id(struct_id: int):
+    row = property_matrix.get().row(struct_id)
+    if row is None:
         raise HTTPException(status_code=404, detail="struct_id not found")
-    return result
-
-
-# Table 4: id_type
-@app.get("/id_type")
-def read_id_type(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return db.query(IdType).offset(skip).limit(limit).all()
-
-@app.get("/id_type/id/{id}")
-def read_id_type_by_id(id: int, db: Session = Depends(get_db)):
-    result = db.query(IdType).filter(IdType.id == id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="id not found")
-    return result
-
-@app.get("/id_type/type/{type}")
-def read_id_type_by_type(type: str, db: Session = Depends(get_db)):
-    decoded_type = unquote(type)
-    result = db.query(IdType).filter(func.trim(IdType.type).ilike(f"%{decoded_type}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="type not found")
-    return result
-
-
-# Table 5: synonyms
-@app.get("/synonyms")
-def read_synonyms(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return db.query(Synonyms).offset(skip).limit(limit).all()
-
-@app.get("/synonyms/syn_id/{syn_id}")
-def read_synonyms_by_syn_id(syn_id: int, db: Session = Depends(get_db)):
-    result = db.query(Synonyms).filter(Synonyms.syn_id == syn_id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="syn_id not found")
-    return result
-
-@app.get("/synonyms/id/{id}")
-def read_synonyms_by_id(id: int, db: Session = Depends(get_db)):
-    result = db.query(Synonyms).filter(Synonyms.id == id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="id not found")
-    return result
-
-@app.get("/synonyms/name/{name}")
-def read_synonyms_by_name(name: str, db: Session = Depends(get_db)):
-    decoded_name = unquote(name)
-    result = db.query(Synonyms).filter(func.trim(Synonyms.name).ilike(f"%{decoded_name}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="name not found")
-    return result
-
-# Table 6: target_class
-@app.get("/target_class")
-def read_target_class(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return db.query(TargetClass).offset(skip).limit(limit).all()
-
-@app.get("/target_class/id/{id}")
-def read_target_class_by_id(id: int, db: Session = Depends(get_db)):
-    result = db.query(TargetClass).filter(TargetClass.id == id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="id not found")
-    return result
-
-@app.get("/target_class/l1/{l1}")
-def read_target_class_by_l1(l1: str, db: Session = Depends(get_db)):
-    decoded_l1 = unquote(l1)
-    result = db.query(TargetClass).filter(func.trim(TargetClass.l1).ilike(f"%{decoded_l1}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="l1 not found")
-    return result
-
-
-# Table 7: target_component
-@app.get("/target_component")
-def read_target_component(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return db.query(TargetComponent).offset(skip).limit(limit).all()
-
-@app.get("/target_component/id/{id}")
-def read_target_component_by_id(id: int, db: Session = Depends(get_db)):
-    result = db.query(TargetComponent).filter(TargetComponent.id == id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="id not found")
-    return result
-
-@app.get("/target_component/accession/{accession}")
-def read_target_component_by_accession(accession: str, db: Session = Depends(get_db)):
-    decoded_accession = unquote(accession)
-    result = db.query(TargetComponent).filter(func.trim(TargetComponent.accession).ilike(f"%{decoded_accession}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="accession not found")
-    return result
-
-@app.get("/target_component/swissprot/{swissprot}")
-def read_target_component_by_swissprot(swissprot: str, db: Session = Depends(get_db)):
-    decoded_swissprot = unquote(swissprot)
-    result = db.query(TargetComponent).filter(func.trim(TargetComponent.swissprot).ilike(f"%{decoded_swissprot}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="swissprot not found")
-    return result
-
-@app.get("/target_component/organism/{organism}")
-def read_target_component_by_organism(organism: str, db: Session = Depends(get_db)):
-    decoded_organism = unquote(organism)
-    result = db.query(TargetComponent).filter(func.trim(TargetComponent.organism).ilike(f"%{decoded_organism}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="organism not found")
-    return result
-
-@app.get("/target_component/gene/{gene}")
-def read_target_component_by_gene(gene: str, db: Session = Depends(get_db)):
-    decoded_gene = unquote(gene)
-    result = db.query(TargetComponent).filter(func.trim(TargetComponent.gene).ilike(f"%{decoded_gene}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="gene not found")
-    return result
-
-
-# Table 8: target_dictionary
-@app.get("/target_dictionary")
-def read_target_dictionary(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return db.query(TargetDictionary).offset(skip).limit(limit).all()
-
-@app.get("/target_dictionary/id/{id}")
-def read_target_dictionary_by_id(id: int, db: Session = Depends(get_db)):
-    result = db.query(TargetDictionary).filter(TargetDictionary.id == id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="id not found")
-    return result
-
-@app.get("/target_dictionary/target_class/{target_class}")
-def read_target_dictionary_by_target_class(target_class: str, db: Session = Depends(get_db)):
-    decoded_target_class = unquote(target_class)
-    result = db.query(TargetDictionary).filter(func.trim(TargetDictionary.target_class).ilike(f"%{decoded_target_class}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="target_class not found")
-    return result
-
-
-# Table 9: target_go
-@app.get("/target_go")
-def read_target_go(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return db.query(TargetGo).offset(skip).limit(limit).all()
-
-@app.get("/target_go/id/{id}")
-def read_target_go_by_id(id: str, db: Session = Depends(get_db)):
-    decoded_id = unquote(id)
-    result = db.query(TargetGo).filter(func.trim(TargetGo.id).ilike(f"%{decoded_id}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="id not found")
-    return result
-
-@app.get("/target_go/type/{type}")
-def read_target_go_by_type(type: str, db: Session = Depends(get_db)):
-    decoded_type = unquote(type)
-    result = db.query(TargetGo).filter(func.trim(TargetGo.type).ilike(f"%{decoded_type}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="type not found")
-    return result
-
-
-# Table 10: target_keyword
-@app.get("/target_keyword")
-def read_target_keyword(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return db.query(TargetKeyword).offset(skip).limit(limit).all()
-
-@app.get("/target_keyword/id/{id}")
-def read_target_keyword_by_id(id: str, db: Session = Depends(get_db)):
-    decoded_id = unquote(id)
-    result = db.query(TargetKeyword).filter(func.trim(TargetKeyword.id).ilike(f"%{decoded_id}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="id not found")
-    return result
-
-@app.get("/target_keyword/category/{category}")
-def read_target_keyword_by_category(category: str, db: Session = Depends(get_db)):
-    decoded_category = unquote(category)
-    result = db.query(TargetKeyword).filter(func.trim(TargetKeyword.category).ilike(f"%{decoded_category}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="category not found")
-    return result
-
-@app.get("/target_keyword/keyword/{keyword}")
-def read_target_keyword_by_keyword(keyword: str, db: Session = Depends(get_db)):
-    decoded_keyword = unquote(keyword)
-    result = db.query(TargetKeyword).filter(func.trim(TargetKeyword.keyword).ilike(f"%{decoded_keyword}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="keyword not found")
-    return result
-
-
-# Table 11: td2tc
-@app.get("/td2tc")
-def read_td2tc(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return db.query(Td2tc).offset(skip).limit(limit).all()
-
-@app.get("/td2tc/target_id/{target_id}")
-def read_td2tc_by_target_id(target_id: int, db: Session = Depends(get_db)):
-    result = db.query(Td2tc).filter(Td2tc.target_id == target_id).all()
-    if not result:
+    return {"struct_id": struct_id, "properties": row}
+
+
+# Sparse drug x target activity matrix (CSR), cached until dbversion changes
+@app.get("/act_table_full/matrix")
+def download_activity_matrix(act_type: Optional[str] = None, organism: Optional[str] = None, aggregate: str = "max", format: str = "npz"):
+    if aggregate not in activity_matrix.AGGREGATES:
+        raise HTTPException(status_code=400, detail="aggregate must be max or median")
+    if format not in activity_matrix.EXPORTERS:
+        raise HTTPException(status_code=400, detail="format must be npz or arrow")
+    matrix = activity_matrix.get_activity_matrix(act_type, organism, aggregate)
+    if matrix is None or not matrix.nnz:
+        raise HTTPException(status_code=404, detail="no activities match the filters")
+    try:
+        content = matrix.export(format)
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    filename = f"drugcentral_activity_{activity_matrix.activity_matrices.version}_{aggregate}.{format}"
+    return Response(content=content, media_type="application/octet-stream",
+                    headers={"Content-Disposition": f"attachment; filename={filename}",
+                             "X-Matrix-Shape": f"{matrix.shape[0]}x{matrix.shape[1]}"})
+
+
+# Per-target activity statistics, precomputed once per dbversion
+@app.get("/activity_summary")
+def read_activity_summary(skip: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000)):
+    summaries = activity_summaries.get()
+    target_ids = summaries.target_ids[skip:skip + limit]
+    return {"total": len(summaries.target_ids), "results": [summaries.by_target[t] for t in target_ids]}
+
+@app.get("/targets/{target_id}/activity_summary")
+def read_target_activity_summary(target_id: int):
+    summary = activity_summaries.get().by_target.get(target_id)
+    if summary is None:
         raise HTTPException(status_code=404, detail="target_id not found")
-    return result
-
-@app.get("/td2tc/component_id/{component_id}")
-def read_td2tc_by_component_id(component_id: int, db: Session = Depends(get_db)):
-    result = db.query(Td2tc).filter(Td2tc.component_id == component_id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="component_id not found")
-    return result
-
-
-# Table 12: tdgo2tc
-@app.get("/tdgo2tc")
-def read_tdgo2tc(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return db.query(Tdgo2tc).offset(skip).limit(limit).all()
-
-@app.get("/tdgo2tc/id/{id}")
-def read_tdgo2tc_by_id(id: int, db: Session = Depends(get_db)):
-    result = db.query(Tdgo2tc).filter(Tdgo2tc.id == id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="id not found")
-    return result
-
-@app.get("/tdgo2tc/go_id/{go_id}")
-def read_tdgo2tc_by_go_id(go_id: str, db: Session = Depends(get_db)):
-    decoded_go_id = unquote(go_id)
-    result = db.query(Tdgo2tc).filter(func.trim(Tdgo2tc.go_id).ilike(f"%{decoded_go_id}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="go_id not found")
-    return result
-
-@app.get("/tdgo2tc/component_id/{component_id}")
-def read_tdgo2tc_by_component_id(component_id: int, db: Session = Depends(get_db)):
-    result = db.query(Tdgo2tc).filter(Tdgo2tc.component_id == component_id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="component_id not found")
-    return result
-
-
-
-# Table 13: tdkey2tc
-@app.get("/tdkey2tc")
-def read_tdkey2tc(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return db.query(Tdkey2tc).offset(skip).limit(limit).all()
-
-@app.get("/tdkey2tc/id/{id}")
-def read_tdkey2tc_by_id(id: int, db: Session = Depends(get_db)):
-    result = db.query(Tdkey2tc).filter(Tdkey2tc.id == id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="id not found")
-    return result
-
-@app.get("/tdkey2tc/tdkey_id/{tdkey_id}")
-def read_tdkey2tc_by_tdkey_id(tdkey_id: str, db: Session = Depends(get_db)):
-    decoded_tdkey_id = unquote(tdkey_id)
-    result = db.query(Tdkey2tc).filter(func.trim(Tdkey2tc.tdkey_id).ilike(f"%{decoded_tdkey_id}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="tdkey_id not found")
-    return result
-
-@app.get("/tdkey2tc/component_id/{component_id}")
-def read_tdkey2tc_by_component_id(component_id: int, db: Session = Depends(get_db)):
-    result = db.query(Tdkey2tc).filter(Tdkey2tc.component_id == component_id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="component_id not found")
-    return result
-
-
-
-# Table 14: omop_relationship
-@app.get("/omop_relationship")
-def read_omop_relationship(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return db.query(OmopRelationship).offset(skip).limit(limit).all()
-
-@app.get("/omop_relationship/id/{id}")
-def read_omop_relationship_by_id(id: int, db: Session = Depends(get_db)):
-    result = db.query(OmopRelationship).filter(OmopRelationship.id == id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="id not found")
-    return result
-
-@app.get("/omop_relationship/struct_id/{struct_id}")
-def read_omop_relationship_by_struct_id(struct_id: int, db: Session = Depends(get_db)):
-    result = db.query(OmopRelationship).filter(OmopRelationship.struct_id == struct_id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="struct_id not found")
-    return result
-
-@app.get("/omop_relationship/concept_id/{concept_id}")
-def read_omop_relationship_by_concept_id(concept_id: int, db: Session = Depends(get_db)):
-    result = db.query(OmopRelationship).filter(OmopRelationship.concept_id == concept_id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="concept_id not found")
-    return result
-
-@app.get("/omop_relationship/relationship_name/{relationship_name}")
-def read_omop_relationship_by_relationship_name(relationship_name: str, db: Session = Depends(get_db)):
-    decoded_relationship_name = unquote(relationship_name)
-    result = db.query(OmopRelationship).filter(func.trim(OmopRelationship.relationship_name).ilike(f"%{decoded_relationship_name}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="relationship_name not found")
-    return result
-
-@app.get("/omop_relationship/concept_name/{concept_name}")
-def read_omop_relationship_by_concept_name(concept_name: str, db: Session = Depends(get_db)):
-    decoded_concept_name = unquote(concept_name)
-    result = db.query(OmopRelationship).filter(func.trim(OmopRelationship.concept_name).ilike(f"%{decoded_concept_name}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="concept_name not found")
-    return result
-
-@app.get("/omop_relationship/umls_cui/{umls_cui}")
-def read_omop_relationship_by_umls_cui(umls_cui: str, db: Session = Depends(get_db)):
-    decoded_umls_cui = unquote(umls_cui)
-    result = db.query(OmopRelationship).filter(func.trim(OmopRelationship.umls_cui).ilike(f"%{decoded_umls_cui}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="umls_cui not found")
-    return result
-
-@app.get("/omop_relationship/cui_semantic_type/{cui_semantic_type}")
-def read_omop_relationship_by_cui_semantic_type(cui_semantic_type: str, db: Session = Depends(get_db)):
-    decoded_cui_semantic_type = unquote(cui_semantic_type)
-    result = db.query(OmopRelationship).filter(func.trim(OmopRelationship.cui_semantic_type).ilike(f"%{decoded_cui_semantic_type}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="cui_semantic_type not found")
-    return result
-
-@app.get("/omop_relationship/snomed_conceptid/{snomed_conceptid}")
-def read_omop_relationship_by_snomed_conceptid(snomed_conceptid: int, db: Session = Depends(get_db)):
-    result = db.query(OmopRelationship).filter(OmopRelationship.snomed_conceptid == snomed_conceptid).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="snomed_conceptid not found")
-    return result
-
-
+    return summary
 
-# Table 15: product
-@app.get("/product")
-def read_product(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return db.query(Product).offset(skip).limit(limit).all()
 
-@app.get("/product/id/{id}")
-def read_product_by_id(id: int, db: Session = Depends(get_db)):
-    result = db.query(Product).filter(Product.id == id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="id not found")
-    return result
-
-@app.get("/product/ndc_product_code/{ndc_product_code}")
-def read_product_by_ndc_product_code(ndc_product_code: str, db: Session = Depends(get_db)):
-    decoded_ndc_product_code = unquote(ndc_product_code)
-    result = db.query(Product).filter(func.trim(Product.ndc_product_code).ilike(f"%{decoded_ndc_product_code}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="ndc_product_code not found")
-    return result
-
-@app.get("/product/product_name/{product_name}")
-def read_product_by_product_name(product_name: str, db: Session = Depends(get_db)):
-    decoded_product_name = unquote(product_name)
-    result = db.query(Product).filter(func.trim(Product.product_name).ilike(f"%{decoded_product_name}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="product_name not found")
-    return result
-
-@app.get("/product/route/{route}")
-def read_product_by_route(route: str, db: Session = Depends(get_db)):
-    decoded_route = unquote(route)
-    result = db.query(Product).filter(func.trim(Product.route).ilike(f"%{decoded_route}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="route not found")
-    return result
-
-
-
-# Table 16: struct2obprod
-@app.get("/struct2obprod")
-def read_struct2obprod(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return db.query(Struct2obprod).offset(skip).limit(limit).all()
-
-@app.get("/struct2obprod/struct_id/{struct_id}")
-def read_struct2obprod_by_struct_id(struct_id: int, db: Session = Depends(get_db)):
-    result = db.query(Struct2obprod).filter(Struct2obprod.struct_id == struct_id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="struct_id not found")
-    return result
-
-@app.get("/struct2obprod/prod_id/{prod_id}")
-def read_struct2obprod_by_prod_id(prod_id: int, db: Session = Depends(get_db)):
-    result = db.query(Struct2obprod).filter(Struct2obprod.prod_id == prod_id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="prod_id not found")
-    return result
-
-
-
-# Table 17: atc
-@app.get("/atc")
-def read_atc(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return db.query(Atc).offset(skip).limit(limit).all()
-
-@app.get("/atc/id/{id}")
-def read_atc_by_id(id: int, db: Session = Depends(get_db)):
-    result = db.query(Atc).filter(Atc.id == id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="id not found")
-    return result
-
-@app.get("/atc/code/{code}")
-def read_atc_by_code(code: str, db: Session = Depends(get_db)):
-    decoded_code = unquote(code)
-    result = db.query(Atc).filter(func.trim(Atc.code).ilike(f"%{decoded_code}%")).all()
-    if not result:
+# Multi-hop traversal over struct -> target -> component -> go/keyword links,
+# e.g. /graph/neighbors?from=struct:123&from=struct:456&path=target,component,go
+@app.get("/graph/neighbors")
+def read_graph_neighbors(from_: List[str] = Query(..., alias="from"), path: str = ""):
+    sources = [node for value in from_ for node in value.split(",") if node]
+    hops = [hop.strip() for hop in path.split(",") if hop.strip()]
+    try:
+        node_type, nodes = graph_index.get().neighbors(sources, hops)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"from": sources, "path": hops, "type": node_type, "count": len(nodes), "nodes": nodes}
+
+
+# GO / UniProt keyword over-representation for a set of targets or components
+@app.post("/enrichment")
+def enrichment(request: EnrichmentRequest):
+    if not request.target_ids and not request.component_ids:
+        raise HTTPException(status_code=400, detail="target_ids or component_ids is required")
+    result = enrichment_index.get().enrich(request.mode, request.target_ids, request.component_ids,
+                                           term_type=request.term_type, min_count=request.min_count)
+    if not result["query_size"]:
+        raise HTTPException(status_code=404, detail="no annotated components for the given ids")
+    return result
+
+
+# Pairwise drug-drug interaction check for a medication list
+@app.post("/ddi/check")
+def check_ddi(request: DdiCheckRequest):
+    resolver = resolver_index.get()
+    drugs, unresolved = [], []
+    for drug in request.drugs:
+        if isinstance(drug, int):
+            struct_ids = [drug]
+        else:
+            struct_ids = list(dict.fromkeys(m["struct_id"] for m in resolver.resolve(drug)))
+        if not struct_ids:
+            unresolved.append(drug)
+            continue
+        drugs.append({"input": drug, "struct_ids": struct_ids})
+    return {"drugs": drugs, "unresolved": unresolved, "interactions": ddi_index.get().check(drugs)}
+
+
+# ATC hierarchy served from a precomputed in-memory tree
+@app.get("/atc/tree")
+def read_atc_hierarchy():
+    return atc_tree.get().compact()
+
+@app.get("/atc/tree/{code}")
+def read_atc_subtree(code: str):
+    subtree = atc_tree.get().subtree(unquote(code))
+    if subtree is None:
         raise HTTPException(status_code=404, detail="code not found")
-    return result
+    return subtree
 
-@app.get("/atc/chemical_substance/{chemical_substance}")
-def read_atc_by_chemical_substance(chemical_substance: str, db: Session = Depends(get_db)):
-    decoded_chemical_substance = unquote(chemical_substance)
-    result = db.query(Atc).filter(func.trim(Atc.chemical_substance).ilike(f"%{decoded_chemical_substance}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="chemical_substance not found")
-    return result
-
-
-# Table 18: struct2atc
-@app.get("/struct2atc")
-def read_struct2atc(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return db.query(Struct2atc).offset(skip).limit(limit).all()
-
-@app.get("/struct2atc/struct_id/{struct_id}")
-def read_struct2atc_by_struct_id(struct_id: int, db: Session = Depends(get_db)):
-    result = db.query(Struct2atc).filter(Struct2atc.struct_id == struct_id).all()
-    if not result:
+@app.get("/atc/{code}/drugs")
+def read_atc_drugs(code: str):
+    drugs = atc_tree.get().drugs(unquote(code))
+    if drugs is None:
+        raise HTTPException(status_code=404, detail="code not found")
+    return drugs
+
+
+# Disease Ontology terms, hierarchy, cross-references and drugs (in-memory)
+@app.get("/doid/xref/{source}/{xref}")
+def read_doid_by_xref(source: str, xref: str):
+    result = doid_index.get().lookup_xref(unquote(source), unquote(xref))
+    if not result:
+        raise HTTPException(status_code=404, detail="xref not found")
+    return result
+
+@app.get("/doid/{id}")
+def read_doid_term(id: str):
+    term = doid_index.get().term(normalize_doid(unquote(id)))
+    if term is None:
+        raise HTTPException(status_code=404, detail="doid not found")
+    return term
+
+@app.get("/doid/{id}/drugs")
+def read_doid_drugs(id: str, include_descendants: bool = False):
+    index = doid_index.get()
+    doid = normalize_doid(unquote(id))
+    if doid not in index.terms:
+        raise HTTPException(status_code=404, detail="doid not found")
+    return index.drugs(doid, include_descendants=include_descendants)
+
+
+# Unified search: classify q (InChIKey, CAS, NDC, ATC, UniProt or text) and query
+# the plausible tables concurrently under one deadline
+@app.get("/search")
+def search(q: str, timeout: float = 2.0):
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=400, detail="q must not be empty")
+    return unified_search.search(q, timeout=max(0.1, min(timeout, 10.0)))
+
+
+# Orange Book patents and exclusivities, answered from a sorted in-memory date index
+@app.get("/orangebook/expiring")
+def read_orangebook_expiring(from_: datetime.date = Query(..., alias="from"), to: datetime.date = Query(...), kind: Optional[str] = None,
+                             skip: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000)):
+    if kind is not None and kind not in ORANGEBOOK_KINDS:
+        raise HTTPException(status_code=400, detail="kind must be patent or exclusivity")
+    if to < from_:
+        raise HTTPException(status_code=400, detail="to must not be before from")
+    events = orangebook_index.get().expiring(from_, to, kind)
+    return {"total": len(events), "results": events[skip:skip + limit]}
+
+@app.get("/orangebook/{struct_id}")
+def read_orangebook_by_struct_id(struct_id: int):
+    result = orangebook_index.get().for_struct(struct_id)
+    if result is None:
         raise HTTPException(status_code=404, detail="struct_id not found")
     return result
 
-@app.get("/struct2atc/atc_code/{atc_code}")
-def read_struct2atc_by_atc_code(atc_code: str, db: Session = Depends(get_db)):
-    decoded_atc_code = unquote(atc_code)
-    result = db.query(Struct2atc).filter(func.trim(Struct2atc.atc_code).ilike(f"%{decoded_atc_code}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="atc_code not found")
-    return result
-
-
-
-# Table 19: drug_class
-@app.get("/drug_class")
-def read_drug_class(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return db.query(DrugClass).offset(skip).limit(limit).all()
-
-@app.get("/drug_class/id/{id}")
-def read_drug_class_by_id(id: int, db: Session = Depends(get_db)):
-    result = db.query(DrugClass).filter(DrugClass.id == id).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="id not found")
-    return result
-
-@app.get("/drug_class/name/{name}")
-def read_drug_class_by_name(name: str, db: Session = Depends(get_db)):
-    decoded_name = unquote(name)
-    result = db.query(DrugClass).filter(func.trim(DrugClass.name).ilike(f"%{decoded_name}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="name not found")
-    return result
-
-@app.get("/drug_class/source/{source}")
-def read_drug_class_by_source(source: str, db: Session = Depends(get_db)):
-    decoded_source = unquote(source)
-    result = db.query(DrugClass).filter(func.trim(DrugClass.source).ilike(f"%{decoded_source}%")).all()
-    if not result:
-        raise HTTPException(status_code=404, detail="source not found")
-    return result
-
-
-
-
-
-
-
-
-
 
+# Regulatory approvals, served from per-drug summaries precomputed once per dbversion
+@app.get("/approvals")
+def read_approvals(agency: Optional[str] = None, year: Optional[int] = None, orphan: Optional[bool] = None,
+                   skip: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000)):
+    summaries = approval_summaries.get()
+    rows = summaries.approvals(agency=agency, year=year, orphan=orphan)
+    return {"total": len(rows), "histogram": summaries.histogram(agency=agency, orphan=orphan),
+            "results": rows[skip:skip + limit]}
 
+@app.get("/approvals/histogram")
+def read_approval_histogram(agency: Optional[str] = None, orphan: Optional[bool] = None):
+    return approval_summaries.get().histogram(agency=agency, orphan=orphan)
 
+@app.get("/approvals/{struct_id}")
+def read_approvals_by_struct_id(struct_id: int):
+    summary = approval_summaries.get().by_struct.get(struct_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="struct_id not found")
+    return summary
+
+
+# GA4GH DRS v1 over the versioned exports built by `python -m app.drs`
+@app.get("/ga4gh/drs/v1/service-info")
+def drs_service_info():
+    return {"id": "edu.unm.drugcentral.drs", "name": "DrugCentral DRS API",
+            "type": {"group": "org.ga4gh", "artifact": "drs", "version": "1.2.0"},
+            "organization": {"name": "CFDE IDG DCC, University of New Mexico", "url": "https://drugcentral.org"},
+            "version": "1.0.0", "drs": {"maxBulkRequestLength": drs.BULK_MAX_OBJECTS}}
+
+@app.post("/ga4gh/drs/v1/objects")
+def read_drs_objects_bulk(body: DrsBulkRequest, request: Request):
+    objects = drs_index.refresh()
+    base_url = str(request.base_url)
+    resolved, unresolved = [], []
+    for object_id in dict.fromkeys(body.bulk_object_ids):
+        entry = objects.get(object_id)
+        if entry is None:
+            unresolved.append(object_id)
+        else:
+            resolved.append(drs.drs_object(entry, base_url))
+    return {"summary": {"requested": len(body.bulk_object_ids), "resolved": len(resolved), "unresolved": len(unresolved)},
+            "resolved_drs_object": resolved,
+            "unresolved_drs_objects": [{"error_code": 404, "object_ids": unresolved}] if unresolved else []}
+
+@app.get("/ga4gh/drs/v1/objects/{object_id}")
+def read_drs_object(object_id: str, request: Request):
+    entry = drs_index.get(object_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="object_id not found")
+    return drs.drs_object(entry, str(request.base_url))
+
+@app.get("/ga4gh/drs/v1/objects/{object_id}/access/{access_id}")
+def read_drs_access_url(object_id: str, access_id: str, request: Request):
+    entry = drs_index.get(object_id)
+    if entry is None or entry.get("bundle"):
+        raise HTTPException(status_code=404, detail="object_id not found")
+    if access_id != "https":
+        raise HTTPException(status_code=404, detail="access_id not found")
+    return {"url": str(request.url_for("read_drs_data", object_id=object_id))}
+
+@app.get("/ga4gh/drs/v1/data/{object_id}")
+@app.head("/ga4gh/drs/v1/data/{object_id}", include_in_schema=False)
+def read_drs_data(object_id: str, request: Request):
+    entry = drs_index.get(object_id)
+    if entry is None or entry.get("bundle"):
+        raise HTTPException(status_code=404, detail="object_id not found")
+    size = entry["size"]
+    etag = f'"{entry["checksums"]["sha-256"]}"'
+    headers = {"ETag": etag, "Accept-Ranges": "bytes", "Cache-Control": "public, max-age=31536000, immutable",
+               "Content-Disposition": f"attachment; filename={entry['name']}"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+
+    start, end, status_code = 0, size - 1, 200
+    range_header = request.headers.get("range")
+    if range_header and request.headers.get("if-range", etag) == etag:
+        try:
+            byte_range = drs.parse_range(range_header, size)
+        except ValueError:
+            byte_range = (0, size - 1)  # malformed ranges are ignored per RFC 9110
+        else:
+            if byte_range is None:
+                raise HTTPException(status_code=416, detail="range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+            start, end = byte_range
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    body = drs.iter_file(entry["file"], start, end) if request.method == "GET" else iter(())
+    return StreamingResponse(body, status_code=status_code, media_type=entry["mime_type"], headers=headers)
+
+
+# Slowest statements by route, with EXPLAIN (ANALYZE, BUFFERS) plans sampled over
+# SLOW_QUERY_MS; requires ADMIN_TOKEN to be set and sent as X-Admin-Token
+def require_admin(request: Request):
+    token = request.headers.get("x-admin-token", "")
+    if not ADMIN_TOKEN or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="admin token required")
+
+@app.get("/admin/slow_queries", dependencies=[Depends(require_admin)])
+def read_slow_queries(order: str = Query("max_ms", pattern="^(max_ms|total_ms|mean_ms|calls|slow_calls)$"),
+                      limit: int = 20, all_statements: bool = False):
+    return {"slow_query_ms": profiler.SLOW_QUERY_MS, "explain_sample_rate": profiler.EXPLAIN_SAMPLE_RATE,
+            "evicted_statements": profiler.stats.evicted,
+            "statements": profiler.stats.report(order, max(1, min(limit, 500)), slow_only=not all_statements)}
+
+@app.delete("/admin/slow_queries", dependencies=[Depends(require_admin)])
+def reset_slow_queries():
+    profiler.stats.reset()
+    return {"status": "ok"}
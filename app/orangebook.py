@@ -0,0 +1,78 @@
+"""Orange Book patents and exclusivities joined to structures, with a sorted date index."""
+import datetime
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+
+from app.dbversion import VersionedCache
+from app.models import ObExclusivity, ObPatent, ObProduct, Struct2obprod
+
+KINDS = ("patent", "exclusivity")
+
+
+class OrangeBookIndex:
+    def __init__(self, products: Dict[int, List[dict]], events: List[dict]):
+        self.products = products
+        self.events = sorted(events, key=lambda e: e["expires"])
+        self.dates = [e["expires"].toordinal() for e in self.events]
+        self.by_struct: Dict[int, List[dict]] = {}
+        for event in self.events:
+            self.by_struct.setdefault(event["struct_id"], []).append(event)
+
+    def for_struct(self, struct_id: int) -> Optional[dict]:
+        if struct_id not in self.products:
+            return None
+        events = self.by_struct.get(struct_id, [])
+        return {
+            "struct_id": struct_id,
+            "products": self.products[struct_id],
+            "patents": [e for e in events if e["kind"] == "patent"],
+            "exclusivities": [e for e in events if e["kind"] == "exclusivity"],
+        }
+
+    def expiring(self, start: datetime.date, end: datetime.date, kind: Optional[str] = None) -> List[dict]:
+        lo = bisect_left(self.dates, start.toordinal())
+        hi = bisect_right(self.dates, end.toordinal(), lo)
+        return [e for e in self.events[lo:hi] if kind is None or e["kind"] == kind]
+
+
+def build_orangebook_index(db: Session) -> OrangeBookIndex:
+    products: Dict[int, List[dict]] = {}
+    for struct_id, product in db.execute(
+            select(Struct2obprod.struct_id, ObProduct).join(ObProduct, ObProduct.id == Struct2obprod.prod_id)):
+        products.setdefault(struct_id, []).append({
+            "prod_id": product.id, "trade_name": product.trade_name, "applicant": product.applicant,
+            "appl_type": product.appl_type, "appl_no": product.appl_no, "product_no": product.product_no,
+            "approval_date": product.approval_date, "dose_form": product.dose_form, "route": product.route,
+        })
+
+    def joined(table):
+        return (select(Struct2obprod.struct_id, ObProduct.trade_name, ObProduct.applicant, table)
+                .join(ObProduct, and_(ObProduct.appl_type == table.appl_type,
+                                      ObProduct.appl_no == table.appl_no,
+                                      ObProduct.product_no == table.product_no))
+                .join(Struct2obprod, Struct2obprod.prod_id == ObProduct.id))
+
+    events = []
+    for struct_id, trade_name, applicant, patent in db.execute(
+            joined(ObPatent).where(ObPatent.patent_expire_date.is_not(None))):
+        events.append({
+            "kind": "patent", "expires": patent.patent_expire_date, "struct_id": struct_id,
+            "trade_name": trade_name, "applicant": applicant, "appl_no": patent.appl_no,
+            "product_no": patent.product_no, "patent_no": patent.patent_no,
+            "patent_use_code": patent.patent_use_code, "drug_substance_flag": patent.drug_substance_flag,
+            "drug_product_flag": patent.drug_product_flag,
+        })
+    for struct_id, trade_name, applicant, excl in db.execute(
+            joined(ObExclusivity).where(ObExclusivity.exclusivity_date.is_not(None))):
+        events.append({
+            "kind": "exclusivity", "expires": excl.exclusivity_date, "struct_id": struct_id,
+            "trade_name": trade_name, "applicant": applicant, "appl_no": excl.appl_no,
+            "product_no": excl.product_no, "exclusivity_code": excl.exclusivity_code,
+        })
+    return OrangeBookIndex(products, events)
+
+
+orangebook_index = VersionedCache(build_orangebook_index)
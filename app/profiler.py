@@ -0,0 +1,149 @@
+"""Per-statement timing tagged by route, with sampled EXPLAIN ANALYZE for slow statements.
+
+Engine events time every cursor execution and aggregate it under (route,
+statement). Statements slower than ``SLOW_QUERY_MS`` are sampled at
+``EXPLAIN_SAMPLE_RATE``; on Postgres a background thread re-runs sampled
+SELECTs as ``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)`` on its own connection
+and keeps the plan next to the statement's stats. Only one EXPLAIN runs at a
+time: samples taken while one is in flight, or while the statement's own plan
+is pending, are dropped rather than queued. At most ``MAX_STATEMENTS``
+are tracked: a new statement evicts the one with the least total time, and
+the evictions are counted.
+"""
+import contextvars
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from sqlalchemy import event
+
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 200))
+EXPLAIN_SAMPLE_RATE = float(os.environ.get("EXPLAIN_SAMPLE_RATE", 0.1))
+EXPLAIN_TIMEOUT_MS = 30000
+MAX_STATEMENTS = 2000
+BACKGROUND = "(background)"
+
+# the ASGI scope of the request being served; the router fills in scope["route"]
+current_scope = contextvars.ContextVar("current_scope", default=None)
+
+explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+# held while an EXPLAIN is queued or running, so the executor never backs up
+_explain_slot = threading.Lock()
+
+
+def submit(executor, fn, *args):
+    """``executor.submit`` in a copy of the caller's context, so ``fn``'s statements keep its route."""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+def current_route() -> str:
+    scope = current_scope.get()
+    if scope is None:
+        return BACKGROUND
+    route = scope.get("route")
+    return getattr(route, "path", None) or scope["path"]
+
+
+class QueryStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.entries: Dict[Tuple[str, str], dict] = {}
+        self.evicted = 0
+
+    def record(self, route: str, statement: str, elapsed_ms: float, rows: int) -> dict:
+        with self._lock:
+            entry = self.entries.get((route, statement))
+            if entry is None:
+                if len(self.entries) >= MAX_STATEMENTS:
+                    # the cheapest statement so far makes room, so slow newcomers are still seen
+                    del self.entries[min(self.entries, key=lambda k: self.entries[k]["total_ms"])]
+                    self.evicted += 1
+                entry = self.entries[(route, statement)] = {
+                    "route": route, "statement": statement, "calls": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "rows": 0, "slow_calls": 0, "plan": None, "plan_ms": None, "plan_pending": False}
+            entry["calls"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["rows"] += max(rows, 0)
+            if elapsed_ms >= SLOW_QUERY_MS:
+                entry["slow_calls"] += 1
+            return entry
+
+    def report(self, order: str = "max_ms", limit: int = 20, slow_only: bool = True) -> List[dict]:
+        with self._lock:
+            entries = [dict(e, mean_ms=e["total_ms"] / e["calls"]) for e in self.entries.values()
+                       if e["slow_calls"] or not slow_only]
+        entries.sort(key=lambda e: e[order], reverse=True)
+        return entries[:limit]
+
+    def reset(self):
+        with self._lock:
+            self.entries.clear()
+            self.evicted = 0
+
+
+stats = QueryStats()
+
+
+def _explain(engine, entry: dict, statement: str, parameters, elapsed_ms: float):
+    try:
+        with engine.connect() as conn:
+            conn.info["profiler_skip"] = True
+            try:
+                with conn.begin() as transaction:
+                    conn.exec_driver_sql(f"SET LOCAL statement_timeout = {EXPLAIN_TIMEOUT_MS}")
+                    plan = conn.exec_driver_sql("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement,
+                                                parameters).scalar()
+                    transaction.rollback()
+            finally:
+                conn.info.pop("profiler_skip", None)
+        entry["plan"] = plan
+        entry["plan_ms"] = elapsed_ms  # the call that was sampled, not a later maximum
+    finally:
+        entry["plan_pending"] = False
+        _explain_slot.release()
+
+
+def _before(conn, cursor, statement, parameters, context, executemany):
+    context.profiler_start = time.perf_counter()
+
+
+def _after(conn, cursor, statement, parameters, context, executemany):
+    if conn.info.get("profiler_skip"):
+        return
+    elapsed_ms = (time.perf_counter() - context.profiler_start) * 1000
+    entry = stats.record(current_route(), statement, elapsed_ms, cursor.rowcount)
+    if elapsed_ms < SLOW_QUERY_MS or conn.dialect.name != "postgresql" or executemany:
+        return
+    if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return  # ANALYZE executes the statement
+    if entry["plan_pending"] or (entry["plan"] is not None and elapsed_ms <= entry["plan_ms"]):
+        return
+    if random.random() < EXPLAIN_SAMPLE_RATE and _explain_slot.acquire(blocking=False):
+        entry["plan_pending"] = True
+        explain_executor.submit(_explain, conn.engine, entry, statement, parameters, elapsed_ms)
+
+
+def install(*engines):
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", _before)
+        event.listen(engine, "after_cursor_execute", _after)
+
+
+class RouteContextMiddleware:
+    """Makes the current request's scope visible to the engine events."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_scope.reset(token)
@@ -0,0 +1,109 @@
+"""Dense structures x property matrix pivoted from ``property`` and ``pka``."""
+import io
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.dbversion import VersionedCache
+from app.models import Pka, PropertyType, t_property
+
+
+class PropertyMatrix:
+    def __init__(self, struct_ids: np.ndarray, columns: List[dict], values: np.ndarray):
+        self.struct_ids = struct_ids
+        self.columns = columns
+        self.values = values
+        self._row = {int(sid): i for i, sid in enumerate(struct_ids)}
+        self._exports: Dict[str, bytes] = {}
+
+    def __len__(self):
+        return len(self.struct_ids)
+
+    def row(self, struct_id: int):
+        i = self._row.get(struct_id)
+        if i is None:
+            return None
+        return {col["symbol"]: (None if np.isnan(v) else float(v))
+                for col, v in zip(self.columns, self.values[i])}
+
+    def export(self, fmt: str) -> bytes:
+        if fmt not in self._exports:
+            self._exports[fmt] = EXPORTERS[fmt](self)
+        return self._exports[fmt]
+
+
+def _to_npz(matrix: PropertyMatrix) -> bytes:
+    buf = io.BytesIO()
+    np.savez_compressed(buf, values=matrix.values, struct_ids=matrix.struct_ids,
+                        columns=np.array([c["symbol"] for c in matrix.columns]))
+    return buf.getvalue()
+
+
+def _to_arrow(matrix: PropertyMatrix) -> bytes:
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise RuntimeError("pyarrow is not installed") from e
+    arrays = [pa.array(matrix.struct_ids)] + [
+        pa.array(matrix.values[:, j], from_pandas=True) for j in range(len(matrix.columns))]
+    names = ["struct_id"] + [c["symbol"] for c in matrix.columns]
+    table = pa.Table.from_arrays(arrays, names=names)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+EXPORTERS = {"npz": _to_npz, "arrow": _to_arrow}
+
+
+def build_property_matrix(db: Session) -> PropertyMatrix:
+    columns = []
+    col_index = {}
+    for symbol, name, units, category in db.execute(
+            select(PropertyType.symbol, PropertyType.name, PropertyType.units, PropertyType.category)
+            .order_by(PropertyType.id)):
+        col_index[symbol] = len(columns)
+        columns.append({"symbol": symbol, "name": name, "units": units, "category": category})
+
+    triples = []  # (struct_id, column, value)
+    for struct_id, symbol, value in db.execute(
+            select(t_property.c.struct_id, t_property.c.property_type_symbol, t_property.c.value)):
+        if struct_id is None or value is None or symbol not in col_index:
+            continue
+        triples.append((struct_id, col_index[symbol], value))
+
+    for struct_id, pka_type, pka_level, value in db.execute(
+            select(Pka.struct_id, Pka.pka_type, Pka.pka_level, Pka.value)):
+        if value is None:
+            continue
+        symbol = f"pKa_{pka_type}_{pka_level}" if pka_level else f"pKa_{pka_type}"
+        if symbol not in col_index:
+            col_index[symbol] = len(columns)
+            kind = {"A": "acidic", "B": "basic"}.get(pka_type, pka_type)
+            columns.append({"symbol": symbol, "name": f"pKa ({kind}, {pka_level or 'any'})",
+                            "units": None, "category": "pKa"})
+        triples.append((struct_id, col_index[symbol], value))
+
+    if not triples:
+        return PropertyMatrix(np.empty(0, dtype=np.int64), columns,
+                              np.empty((0, len(columns)), dtype=np.float32))
+
+    sids = np.fromiter((t[0] for t in triples), dtype=np.int64, count=len(triples))
+    cols = np.fromiter((t[1] for t in triples), dtype=np.int64, count=len(triples))
+    vals = np.fromiter((t[2] for t in triples), dtype=np.float64, count=len(triples))
+    struct_ids, rows = np.unique(sids, return_inverse=True)
+
+    # several sources can report the same property; store their mean
+    sums = np.zeros((len(struct_ids), len(columns)), dtype=np.float64)
+    counts = np.zeros_like(sums)
+    np.add.at(sums, (rows, cols), vals)
+    np.add.at(counts, (rows, cols), 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        values = (sums / counts).astype(np.float32)
+    return PropertyMatrix(struct_ids, columns, values)
+
+
+property_matrix = VersionedCache(build_property_matrix)
@@ -0,0 +1,50 @@
+"""Single hash index mapping external identifiers and names to struct_ids."""
+from typing import Dict, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.dbversion import VersionedCache
+from app.models import Identifier, Structures, Synonyms
+
+
+def normalize(value: str) -> str:
+    return " ".join(value.split()).casefold()
+
+
+class ResolverIndex:
+    def __init__(self):
+        self._index: Dict[str, List[Tuple[int, str]]] = {}
+
+    def add(self, value, struct_id, namespace):
+        if not value or struct_id is None:
+            return
+        matches = self._index.setdefault(normalize(value), [])
+        if (struct_id, namespace) not in matches:
+            matches.append((struct_id, namespace))
+
+    def __len__(self):
+        return len(self._index)
+
+    def resolve(self, value: str) -> List[dict]:
+        return [{"struct_id": struct_id, "namespace": namespace}
+                for struct_id, namespace in self._index.get(normalize(value), ())]
+
+
+def build_resolver_index(db: Session) -> ResolverIndex:
+    index = ResolverIndex()
+    for identifier, id_type, struct_id in db.execute(
+            select(Identifier.identifier, Identifier.id_type, Identifier.struct_id)):
+        index.add(identifier, struct_id, id_type)
+    for struct_id, cas_reg_no, inchikey in db.execute(
+            select(Structures.id, Structures.cas_reg_no, Structures.inchikey)):
+        index.add(cas_reg_no, struct_id, "CAS")
+        if inchikey:
+            index.add(inchikey, struct_id, "InChIKey")
+            index.add(inchikey.strip().split("-")[0], struct_id, "InChIKey_connectivity")
+    for name, struct_id in db.execute(select(Synonyms.name, Synonyms.id)):
+        index.add(name, struct_id, "synonym")
+    return index
+
+
+resolver_index = VersionedCache(build_resolver_index)
@@ -0,0 +1,36 @@
+"""Core row fetching and orjson rendering for the table read endpoints.
+
+Selecting ``Model.__table__`` returns plain row mappings instead of ORM
+instances, and orjson serializes those directly, skipping identity-map
+bookkeeping and ``jsonable_encoder``'s per-attribute walk.
+
+The JSON has the same structure and values as ``JSONResponse`` output, but
+floats are not always spelled the same way: orjson writes ``0.00001`` and
+``1e16`` where ``json`` writes ``1e-05`` and ``1e+16``, and NaN or infinity as
+``null`` rather than the non-standard ``NaN``/``Infinity``. Whole Decimals are
+written as floats (``5.0``), where ``jsonable_encoder`` gives integers.
+"""
+import base64
+from decimal import Decimal
+from typing import Any, List, Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+
+def _default(value):
+    if isinstance(value, (bytes, memoryview)):
+        return base64.b64encode(bytes(value)).decode("ascii")
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+
+class RowsResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def fetch_rows(db: Session, stmt, params: Optional[dict] = None) -> List[dict]:
+    return [dict(row) for row in db.execute(stmt, params).mappings()]
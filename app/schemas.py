@@ -0,0 +1,24 @@
+from typing import List, Literal, Optional, Union
+
+from pydantic import BaseModel, Field
+
+
+class ResolveBatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=100000)
+
+
+class EnrichmentRequest(BaseModel):
+    mode: Literal["go", "keyword"] = "go"
+    target_ids: List[int] = []
+    component_ids: List[int] = []
+    term_type: Optional[str] = Field(None, description="GO aspect (P, F, C) or keyword category")
+    min_count: int = Field(1, ge=1)
+
+
+class DdiCheckRequest(BaseModel):
+    drugs: List[Union[int, str]] = Field(..., min_length=2, max_length=200, description="struct_ids or drug names")
+
+
+class DrsBulkRequest(BaseModel):
+    bulk_object_ids: List[str] = Field(..., min_length=1, max_length=5000)
+    passports: List[str] = []
@@ -0,0 +1,126 @@
+"""Unified search: classify the query, fan out to plausible tables concurrently."""
+import re
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, NamedTuple
+
+from sqlalchemy import func, select
+
+from app import profiler
+from app.database import ReadSessionLocal
+from app.models import (Atc, DrugClass, OmopRelationship, Product, Structures, Synonyms,
+                        TargetComponent, TargetDictionary)
+
+# InChIKeys are upper case by definition, so they are matched against the query as typed
+INCHIKEY = re.compile(r"^[A-Z]{14}(-[A-Z]{10}-[A-Z])?$")
+BARE_INCHIKEY_BLOCK = re.compile(r"^[A-Z]{14}$")
+
+PATTERNS = [
+    ("cas", re.compile(r"^\d{2,7}-\d{2}-\d$")),
+    ("ndc", re.compile(r"^\d{4,5}-\d{3,4}(-\d{1,2})?$")),
+    ("atc", re.compile(r"^[A-Z]\d{2}([A-Z]{1,2}(\d{2})?)?$")),
+    ("uniprot", re.compile(r"^([OPQ]\d[A-Z0-9]{3}\d|[A-NR-Z]\d([A-Z][A-Z0-9]{2}\d){1,2})(-\d+)?$")),
+]
+
+MATCH_RANK = {"exact": 0, "prefix": 1, "contains": 2}
+PER_TABLE_LIMIT = 25
+
+executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="search")
+
+
+def classify(q: str) -> List[str]:
+    """Identifier shapes ``q`` matches, or ``["text"]`` when it looks like none."""
+    stripped = q.strip()
+    upper = stripped.upper()
+    shapes = ["inchikey"] if INCHIKEY.match(stripped) else []
+    shapes += [shape for shape, pattern in PATTERNS if pattern.match(upper)]
+    # a bare 14-letter block may just be a drug name typed in capitals
+    if not shapes or BARE_INCHIKEY_BLOCK.match(stripped):
+        shapes.append("text")
+    return shapes
+
+
+class Source(NamedTuple):
+    table: str
+    key: object     # column holding the matched value
+    label: object   # column shown to the user
+    id: object      # column identifying the record
+    build: Callable  # (q) -> where clause
+
+
+def _equals(column):
+    return lambda q: func.upper(func.trim(column)) == q.strip().upper()
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _prefix(column):
+    return lambda q: func.trim(column).ilike(f"{_escape_like(q.strip())}%", escape="\\")
+
+
+def _contains(column):
+    return lambda q: func.trim(column).ilike(f"%{_escape_like(q.strip())}%", escape="\\")
+
+
+SOURCES: Dict[str, List[Source]] = {
+    "inchikey": [Source("structures", Structures.inchikey, Structures.name, Structures.id, _prefix(Structures.inchikey))],
+    "cas": [Source("structures", Structures.cas_reg_no, Structures.name, Structures.id, _equals(Structures.cas_reg_no))],
+    "ndc": [Source("product", Product.ndc_product_code, Product.product_name, Product.id, _prefix(Product.ndc_product_code))],
+    "atc": [Source("atc", Atc.code, Atc.chemical_substance, Atc.id, _prefix(Atc.code))],
+    "uniprot": [Source("target_component", TargetComponent.accession, TargetComponent.name, TargetComponent.id,
+                       _equals(TargetComponent.accession))],
+    "text": [
+        Source("structures", Structures.name, Structures.name, Structures.id, _contains(Structures.name)),
+        Source("synonyms", Synonyms.name, Synonyms.name, Synonyms.id, _contains(Synonyms.name)),
+        Source("product", Product.product_name, Product.product_name, Product.id, _contains(Product.product_name)),
+        Source("target_component", TargetComponent.gene, TargetComponent.name, TargetComponent.id,
+               _equals(TargetComponent.gene)),
+        Source("target_dictionary", TargetDictionary.name, TargetDictionary.name, TargetDictionary.id,
+               _contains(TargetDictionary.name)),
+        Source("drug_class", DrugClass.name, DrugClass.name, DrugClass.id, _contains(DrugClass.name)),
+        Source("omop_relationship", OmopRelationship.concept_name, OmopRelationship.concept_name,
+               OmopRelationship.concept_id, _contains(OmopRelationship.concept_name)),
+    ],
+}
+
+
+def match_type(q: str, value: str) -> str:
+    q, value = q.strip().casefold(), (value or "").strip().casefold()
+    if value == q:
+        return "exact"
+    if value.startswith(q):
+        return "prefix"
+    return "contains"
+
+
+def _run(shape: str, source: Source, q: str, timeout: float) -> List[dict]:
+    db = ReadSessionLocal()
+    # queries still running at the deadline are stopped by the database, not left to finish
+    db.info["statement_timeout"] = int(timeout * 1000)
+    try:
+        stmt = (select(source.id.label("id"), source.key.label("key"), source.label.label("label"))
+                .where(source.build(q)).distinct().limit(PER_TABLE_LIMIT))
+        return [{"table": source.table, "shape": shape, "match": match_type(q, row.key),
+                 "id": row.id, "key": row.key.strip() if isinstance(row.key, str) else row.key,
+                 "label": row.label} for row in db.execute(stmt)]
+    finally:
+        db.close()
+
+
+def search(q: str, timeout: float = 2.0) -> dict:
+    shapes = classify(q)
+    futures = {profiler.submit(executor, _run, shape, source, q, timeout): f"{shape}:{source.table}"
+               for shape in shapes for source in SOURCES[shape]}
+    done, pending = wait(futures, timeout=timeout)
+    results, failed = [], []
+    for future in done:
+        if future.exception() is not None:
+            failed.append(futures[future])
+        else:
+            results.extend(future.result())
+    for future in pending:
+        future.cancel()
+    results.sort(key=lambda r: (MATCH_RANK[r["match"]], shapes.index(r["shape"]), len(str(r["key"]))))
+    return {"q": q, "shapes": shapes, "results": results,
+            "timed_out": sorted(futures[f] for f in pending), "failed": sorted(failed)}
@@ -0,0 +1,119 @@
+"""Read-only embedded snapshots of the DrugCentral tables (SQLite, or DuckDB if installed).
+
+``python -m app.snapshot drugcentral.sqlite`` copies every table in
+``app.tables`` from the configured database into a single file, indexes the
+exact-match lookup columns of the table routes, and runs ANALYZE. Point
+``DRUGCENTRAL_SNAPSHOT`` at the file to serve from it instead of Postgres
+(see app/database.py). ``omop_relationship_doid_view`` is recreated as a view
+over the copied tables; label full-text search needs Postgres.
+"""
+import argparse
+import os
+
+from sqlalchemy import Column, MetaData, Table, create_engine, event, insert, select, text
+
+from app.table_routes import EXACT, TABLE_ROUTES
+from app.tables import drugcentral_tables
+
+COPY_CHUNK = 10000
+MMAP_SIZE = 1 << 30
+
+# views the app reads, as defined in the DrugCentral schema
+SNAPSHOT_VIEWS = {
+    "omop_relationship_doid_view": (
+        "SELECT o.id, o.struct_id, o.concept_id, o.relationship_name, o.concept_name, o.umls_cui, "
+        "o.snomed_full_name, o.cui_semantic_type, o.snomed_conceptid, x.doid "
+        "FROM omop_relationship o "
+        "LEFT JOIN doid_xref x ON x.xref = o.umls_cui AND x.source = 'UMLS_CUI'"),
+}
+
+
+def snapshot_url(path: str) -> str:
+    scheme = "duckdb" if path.endswith((".duckdb", ".ddb")) else "sqlite"
+    return f"{scheme}:///{path}"
+
+
+def lookup_indexes():
+    """(table, column) pairs looked up by equality in the table routes, other than lone primary keys."""
+    pairs = []
+    for entry in TABLE_ROUTES:
+        table = entry.model.__table__
+        primary_key = [c.name for c in table.primary_key.columns]
+        pairs.extend((table.name, column) for column, match in entry.lookups
+                     if match == EXACT and primary_key != [column])
+    return pairs
+
+
+def snapshot_metadata(tables) -> MetaData:
+    """Plain copies of ``tables``: columns and primary keys only, no Postgres defaults or foreign keys."""
+    metadata = MetaData()
+    for table in tables:
+        Table(table.name, metadata, *[Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+                                      for c in table.columns])
+    return metadata
+
+
+def drop_views(conn):
+    for name in SNAPSHOT_VIEWS:
+        conn.execute(text(f'DROP VIEW IF EXISTS "{name}"'))
+
+
+def create_views(conn):
+    drop_views(conn)
+    for name, query in SNAPSHOT_VIEWS.items():
+        conn.execute(text(f'CREATE VIEW "{name}" AS {query}'))
+
+
+def build_snapshot(source_engine, path: str, tables=None) -> dict:
+    """Write the snapshot to ``path.tmp`` and move it into place once complete."""
+    tables = tables or drugcentral_tables()
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    target = create_engine(snapshot_url(tmp))
+    metadata = snapshot_metadata(tables)
+    metadata.create_all(target)
+    counts = {}
+    with source_engine.connect() as src, target.begin() as dst:
+        for table in tables:
+            copy = metadata.tables[table.name]
+            result = src.execution_options(yield_per=COPY_CHUNK).execute(select(table))
+            counts[table.name] = 0
+            for chunk in result.mappings().partitions():
+                dst.execute(insert(copy), [dict(row) for row in chunk])
+                counts[table.name] += len(chunk)
+        for table_name, column in lookup_indexes():
+            if table_name in metadata.tables:
+                dst.execute(text(f'CREATE INDEX "ix_{table_name}_{column}" ON "{table_name}" ("{column}")'))
+        create_views(dst)
+        dst.execute(text("ANALYZE"))
+    target.dispose()
+    os.replace(tmp, path)
+    return counts
+
+
+def read_only_engine(path: str, **kwargs):
+    """Engine over a snapshot file, opened read-only (SQLite: immutable and memory-mapped)."""
+    if snapshot_url(path).startswith("duckdb"):
+        return create_engine(snapshot_url(path), connect_args={"read_only": True}, **kwargs)
+    engine = create_engine(f"sqlite:///file:{os.path.abspath(path)}?mode=ro&immutable=1&uri=true",
+                           connect_args={"check_same_thread": False}, **kwargs)
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        cursor.execute("PRAGMA query_only=1")
+        cursor.close()
+
+    return engine
+
+
+if __name__ == "__main__":
+    from app.database import engine
+
+    parser = argparse.ArgumentParser(description="Copy the DrugCentral tables into a read-only SQLite/DuckDB file")
+    parser.add_argument("path", help="output file (.sqlite, or .duckdb with duckdb_engine installed)")
+    args = parser.parse_args()
+    counts = build_snapshot(engine, args.path)
+    print(f"wrote {sum(counts.values())} rows from {len(counts)} tables to {args.path}")
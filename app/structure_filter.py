@@ -0,0 +1,96 @@
+"""Columnar NumPy copy of the numeric structures columns for range screens."""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.dbversion import VersionedCache
+from app.models import Structures
+
+# query parameter -> structures column
+FILTER_COLUMNS = {
+    "mw": Structures.cd_molweight,
+    "clogp": Structures.clogp,
+    "alogs": Structures.alogs,
+    "tpsa": Structures.tpsa,
+    "lipinski": Structures.lipinski,
+    "rotb": Structures.rotb,
+    "rgb": Structures.rgb,
+    "arom_c": Structures.arom_c,
+    "sp3_c": Structures.sp3_c,
+    "sp2_c": Structures.sp2_c,
+    "sp_c": Structures.sp_c,
+    "halogen": Structures.halogen,
+    "hetero_sp2_c": Structures.hetero_sp2_c,
+    "o_n": Structures.o_n,
+    "oh_nh": Structures.oh_nh,
+    "fda_labels": Structures.fda_labels,
+    "no_formulations": Structures.no_formulations,
+}
+
+Range = Tuple[Optional[float], Optional[float]]
+
+PRESETS: Dict[str, Dict[str, Range]] = {
+    # Lipinski rule of five
+    "ro5": {"mw": (None, 500), "clogp": (None, 5), "o_n": (None, 10), "oh_nh": (None, 5)},
+    # Teague/Oprea lead-likeness
+    "leadlike": {"mw": (250, 350), "clogp": (None, 3.5), "rotb": (None, 7)},
+}
+
+
+def parse_range(value: str) -> Range:
+    """Parse ``lo..hi``, ``..hi``, ``lo..`` or a single exact value."""
+    try:
+        if ".." not in value:
+            exact = float(value)
+            return exact, exact
+        lo, hi = value.split("..", 1)
+        return (float(lo) if lo else None, float(hi) if hi else None)
+    except ValueError as e:
+        raise ValueError(f"invalid range: {value!r}") from e
+
+
+class StructureColumns:
+    def __init__(self, rows):
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.names = np.array([row[1] for row in rows], dtype=object)
+        self.columns = {
+            param: np.array([np.nan if row[i] is None else row[i] for row in rows], dtype=np.float64)
+            for i, param in enumerate(FILTER_COLUMNS, start=2)
+        }
+
+    def __len__(self):
+        return len(self.ids)
+
+    def mask(self, ranges: Dict[str, Range]) -> np.ndarray:
+        # NaN compares False, so structures missing a filtered value drop out
+        selected = np.ones(len(self.ids), dtype=bool)
+        for param, (lo, hi) in ranges.items():
+            column = self.columns[param]
+            if lo is not None:
+                selected &= column >= lo
+            if hi is not None:
+                selected &= column <= hi
+        return selected
+
+    def project(self, indices: np.ndarray, fields: List[str]) -> List[dict]:
+        out = []
+        for i in indices:
+            row = {"id": int(self.ids[i])}
+            for field in fields:
+                if field == "name":
+                    row["name"] = self.names[i]
+                else:
+                    value = self.columns[field][i]
+                    row[field] = None if np.isnan(value) else float(value)
+            out.append(row)
+        return out
+
+
+def build_structure_columns(db: Session) -> StructureColumns:
+    stmt = select(Structures.id, Structures.name, *FILTER_COLUMNS.values()).order_by(Structures.id)
+    return StructureColumns(db.execute(stmt).all())
+
+
+structure_columns = VersionedCache(build_structure_columns)
@@ -0,0 +1,129 @@
+"""Table lookup routes generated from a declarative registry.
+
+Each table gets ``GET /<table>?skip&limit`` plus ``GET /<table>/<column>/{value}``
+for every lookup column, matched exactly or as a trimmed case-insensitive
+substring. Statements are built once with bind parameters and reused on every
+request, so SQLAlchemy's compiled cache is hit without rebuilding the query.
+
+Results are capped at ``ROW_CAP`` rows; a capped response carries
+``X-Result-Truncated: true``. Substring lookups run under the shorter
+``CONTAINS_TIMEOUT_MS`` statement timeout.
+"""
+import inspect
+import os
+from typing import Dict, List, NamedTuple, Tuple
+from urllib.parse import unquote
+
+from fastapi import Depends, HTTPException
+from sqlalchemy import bindparam, func, select
+
+from app.db_routing import STATEMENT_TIMEOUTS
+from app.models import (ActTableFull, Atc, DrugClass, Identifier, IdType, OmopRelationship, Product,
+                        Struct2atc, Struct2obprod, Structures, Synonyms, TargetClass, TargetComponent,
+                        TargetDictionary, TargetGo, TargetKeyword, Td2tc, Tdgo2tc, Tdkey2tc)
+from app.rows import RowsResponse, fetch_rows
+
+EXACT = "exact"
+CONTAINS = "contains"
+
+ROW_CAP = int(os.environ.get("DB_ROW_CAP", 10000))
+CONTAINS_TIMEOUT_MS = int(os.environ.get("DB_CONTAINS_TIMEOUT_MS", 2000))
+
+
+class TableRoutes(NamedTuple):
+    model: object
+    lookups: List[Tuple[str, str]]  # (column, EXACT | CONTAINS)
+
+
+TABLE_ROUTES = [
+    TableRoutes(ActTableFull, [("act_id", EXACT), ("struct_id", EXACT), ("target_class", CONTAINS),
+                               ("accession", CONTAINS), ("gene", CONTAINS), ("swissprot", CONTAINS),
+                               ("act_type", CONTAINS), ("organism", CONTAINS)]),
+    TableRoutes(Structures, [("cd_id", EXACT), ("id", EXACT), ("name", CONTAINS), ("smiles", CONTAINS),
+                             ("inchikey", CONTAINS)]),
+    TableRoutes(Identifier, [("id", EXACT), ("identifier", CONTAINS), ("id_type", CONTAINS), ("struct_id", EXACT)]),
+    TableRoutes(IdType, [("id", EXACT), ("type", CONTAINS)]),
+    TableRoutes(Synonyms, [("syn_id", EXACT), ("id", EXACT), ("name", CONTAINS)]),
+    TableRoutes(TargetClass, [("id", EXACT), ("l1", CONTAINS)]),
+    TableRoutes(TargetComponent, [("id", EXACT), ("accession", CONTAINS), ("swissprot", CONTAINS),
+                                  ("organism", CONTAINS), ("gene", CONTAINS)]),
+    TableRoutes(TargetDictionary, [("id", EXACT), ("target_class", CONTAINS)]),
+    TableRoutes(TargetGo, [("id", CONTAINS), ("type", CONTAINS)]),
+    TableRoutes(TargetKeyword, [("id", CONTAINS), ("category", CONTAINS), ("keyword", CONTAINS)]),
+    TableRoutes(Td2tc, [("target_id", EXACT), ("component_id", EXACT)]),
+    TableRoutes(Tdgo2tc, [("id", EXACT), ("go_id", CONTAINS), ("component_id", EXACT)]),
+    TableRoutes(Tdkey2tc, [("id", EXACT), ("tdkey_id", CONTAINS), ("component_id", EXACT)]),
+    TableRoutes(OmopRelationship, [("id", EXACT), ("struct_id", EXACT), ("concept_id", EXACT),
+                                   ("relationship_name", CONTAINS), ("concept_name", CONTAINS),
+                                   ("umls_cui", CONTAINS), ("cui_semantic_type", CONTAINS),
+                                   ("snomed_conceptid", EXACT)]),
+    TableRoutes(Product, [("id", EXACT), ("ndc_product_code", CONTAINS), ("product_name", CONTAINS),
+                          ("route", CONTAINS)]),
+    TableRoutes(Struct2obprod, [("struct_id", EXACT), ("prod_id", EXACT)]),
+    TableRoutes(Atc, [("id", EXACT), ("code", CONTAINS), ("chemical_substance", CONTAINS)]),
+    TableRoutes(Struct2atc, [("struct_id", EXACT), ("atc_code", CONTAINS)]),
+    TableRoutes(DrugClass, [("id", EXACT), ("name", CONTAINS), ("source", CONTAINS)]),
+]
+
+# (table, column) -> statement, for reuse outside the generated routes
+STATEMENTS: Dict[Tuple[str, str], object] = {}
+
+
+def list_statement(table):
+    return select(table).offset(bindparam("skip")).limit(bindparam("limit"))
+
+
+def lookup_statement(table, column: str, match: str):
+    if match == EXACT:
+        stmt = select(table).where(table.c[column] == bindparam("value"))
+    else:
+        stmt = select(table).where(func.trim(table.c[column]).ilike(bindparam("value")))
+    return stmt.limit(bindparam("limit"))
+
+
+def capped_response(rows: List[dict], truncated: bool) -> RowsResponse:
+    return RowsResponse(rows, headers={"X-Result-Truncated": "true"} if truncated else None)
+
+
+def _list_handler(stmt, get_db):
+    def handler(skip: int = 0, limit: int = 10, db=Depends(get_db)):
+        result = fetch_rows(db, stmt, {"skip": skip, "limit": min(limit, ROW_CAP)})
+        return capped_response(result, limit > ROW_CAP and len(result) == ROW_CAP)
+    return handler
+
+
+def _lookup_handler(stmt, column: str, match: str, value_type, get_db):
+    def handler(**kwargs):
+        value = kwargs[column]
+        if match == CONTAINS:
+            value = f"%{unquote(value)}%"
+        result = fetch_rows(kwargs["db"], stmt, {"value": value, "limit": ROW_CAP + 1})
+        if not result:
+            raise HTTPException(status_code=404, detail=f"{column} not found")
+        return capped_response(result[:ROW_CAP], len(result) > ROW_CAP)
+
+    # FastAPI reads the path parameter's name and type from the signature
+    handler.__signature__ = inspect.Signature([
+        inspect.Parameter(column, inspect.Parameter.KEYWORD_ONLY, annotation=value_type),
+        inspect.Parameter("db", inspect.Parameter.KEYWORD_ONLY, default=Depends(get_db)),
+    ])
+    return handler
+
+
+def register_table_routes(app, get_db):
+    for entry in TABLE_ROUTES:
+        table = entry.model.__table__
+        name = table.name
+        stmt = list_statement(table)
+        STATEMENTS[(name, "")] = stmt
+        app.add_api_route(f"/{name}", _list_handler(stmt, get_db), methods=["GET"], name=f"read_{name}")
+        for column, match in entry.lookups:
+            stmt = lookup_statement(table, column, match)
+            STATEMENTS[(name, column)] = stmt
+            value_type = table.c[column].type.python_type if match == EXACT else str
+            path = f"/{name}/{column}/{{{column}}}"
+            if match == CONTAINS:
+                STATEMENT_TIMEOUTS[path] = CONTAINS_TIMEOUT_MS
+            app.add_api_route(path,
+                              _lookup_handler(stmt, column, match, value_type, get_db),
+                              methods=["GET"], name=f"read_{name}_by_{column}")
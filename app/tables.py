@@ -0,0 +1,47 @@
+"""The DrugCentral tables in ``app.models`` (the schema also holds unrelated tables)."""
+from app.models import Base
+
+DRUGCENTRAL_TABLES = [
+    "dbversion",
+    "structures",
+    "synonyms",
+    "identifier",
+    "id_type",
+    "act_table_full",
+    "action_type",
+    "target_class",
+    "target_component",
+    "target_dictionary",
+    "target_go",
+    "target_keyword",
+    "td2tc",
+    "tdgo2tc",
+    "tdkey2tc",
+    "omop_relationship",
+    "product",
+    "active_ingredient",
+    "label",
+    "section",
+    "prd2label",
+    "atc",
+    "struct2atc",
+    "drug_class",
+    "struct2drgclass",
+    "ddi",
+    "ddi_risk",
+    "doid",
+    "doid_xref",
+    "approval",
+    "approval_type",
+    "ob_product",
+    "ob_patent",
+    "ob_exclusivity",
+    "struct2obprod",
+    "pka",
+    "property",
+    "property_type",
+]
+
+
+def drugcentral_tables():
+    return [Base.metadata.tables[name] for name in DRUGCENTRAL_TABLES]
@@ -0,0 +1,129 @@
+"""Compression ratio vs. CPU time for typical DrugCentral / Pharos payloads.
+
+    python benchmarks/bench_compression.py [--rows 5000] [--json]
+
+Payloads are synthetic but shaped like real responses: an ``act_table_full``
+target-class listing, an ``omop_relationship`` listing (JSON) and a Pharos
+target CSV export. For each coding and level the report gives the compressed
+size, compression time, and the resulting time-to-last-byte at a few link
+speeds, both for one-shot bodies and for 64 KiB streamed chunks.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.compression import ENCODERS  # noqa: E402
+
+LEVELS = {"gzip": (1, 6, 9), "br": (1, 4, 11), "zstd": (1, 3, 19)}
+LINKS_MBIT = (10, 100, 1000)
+STREAM_CHUNK = 64 * 1024
+
+TARGET_CLASSES = ["Kinase", "GPCR", "Ion channel", "Nuclear hormone receptor", "Enzyme", "Transporter"]
+ACT_TYPES = ["IC50", "Ki", "Kd", "EC50", "ED50"]
+RELATIONSHIPS = ["indication", "contraindication", "off-label use", "symptomatic treatment"]
+CONDITIONS = ["Hypertensive disorder", "Type 2 diabetes mellitus", "Asthma", "Major depressive disorder",
+              "Rheumatoid arthritis", "Chronic kidney disease", "Heart failure", "Migraine"]
+
+
+def act_table_full(rows: int, rng: random.Random) -> bytes:
+    records = []
+    for act_id in range(1, rows + 1):
+        target_id = rng.randrange(1, 3000)
+        records.append({
+            "act_id": act_id, "struct_id": rng.randrange(1, 5000), "target_id": target_id,
+            "target_name": f"Protein kinase {target_id}", "target_class": rng.choice(TARGET_CLASSES),
+            "accession": f"P{rng.randrange(10000, 99999)}", "gene": f"GENE{target_id}",
+            "swissprot": f"KIN{target_id}_HUMAN", "act_value": round(rng.uniform(4, 10), 2), "act_unit": None,
+            "act_type": rng.choice(ACT_TYPES), "act_comment": None, "act_source": rng.choice(["CHEMBL", "IUPHAR", "DRUG MATRIX"]),
+            "relation": "=", "moa": rng.choice([None, 1]), "moa_source": rng.choice([None, "SCIENTIFIC LITERATURE"]),
+            "act_source_url": f"https://www.ebi.ac.uk/chembl/compound/inspect/CHEMBL{rng.randrange(1, 10**6)}",
+            "moa_source_url": None,
+        })
+    return json.dumps(records).encode()
+
+
+def omop_relationship(rows: int, rng: random.Random) -> bytes:
+    return json.dumps([{
+        "id": i, "struct_id": rng.randrange(1, 5000), "concept_id": rng.randrange(10**5, 10**7),
+        "relationship_name": rng.choice(RELATIONSHIPS), "concept_name": rng.choice(CONDITIONS),
+        "umls_cui": f"C{rng.randrange(10**6, 10**7)}", "snomed_full_name": rng.choice(CONDITIONS) + " (disorder)",
+        "cui_semantic_type": "T047", "snomed_conceptid": rng.randrange(10**8, 10**9),
+    } for i in range(1, rows + 1)]).encode()
+
+
+def pharos_targets_csv(rows: int, rng: random.Random) -> bytes:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["sym", "name", "tdl", "fam", "uniprot", "novelty", "ligand_count", "disease_count"])
+    for i in range(rows):
+        writer.writerow([f"GENE{i}", f"Protein kinase {i}", rng.choice(["Tclin", "Tchem", "Tbio", "Tdark"]),
+                         rng.choice(TARGET_CLASSES), f"Q{rng.randrange(10000, 99999)}",
+                         round(rng.random(), 4), rng.randrange(0, 500), rng.randrange(0, 200)])
+    return out.getvalue().encode()
+
+
+PAYLOADS = {
+    "act_table_full/target_class (json)": act_table_full,
+    "omop_relationship (json)": omop_relationship,
+    "pharos targets (csv)": pharos_targets_csv,
+}
+
+
+def compress(coding: str, level: int, body: bytes, chunk: int = 0):
+    encoder = ENCODERS[coding](level)
+    start = time.perf_counter()
+    if chunk:
+        size = 0
+        for i in range(0, len(body), chunk):
+            size += len(encoder.compress(body[i:i + chunk]) + encoder.flush())
+        size += len(encoder.finish())
+    else:
+        size = len(encoder.compress(body) + encoder.finish())
+    return size, time.perf_counter() - start
+
+
+def run(rows: int):
+    rng = random.Random(42)
+    results = []
+    for name, make in PAYLOADS.items():
+        body = make(rows, rng)
+        cases = [("identity", 0, 0)] + [(coding, level, chunk) for coding in ENCODERS
+                                        for level in LEVELS[coding] for chunk in (0, STREAM_CHUNK)]
+        for coding, level, chunk in cases:
+            size, seconds = (len(body), 0.0) if coding == "identity" else compress(coding, level, body, chunk)
+            results.append({
+                "payload": name, "raw_bytes": len(body), "coding": coding, "level": level,
+                "streamed": bool(chunk), "bytes": size, "ratio": round(len(body) / size, 2),
+                "compress_ms": round(seconds * 1000, 2),
+                "total_ms": {f"{mbit}mbit": round((seconds + size * 8 / (mbit * 1e6)) * 1000, 2)
+                             for mbit in LINKS_MBIT},
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000, help="rows per payload")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+    results = run(args.rows)
+    if args.json:
+        print(json.dumps(results, indent=1))
+        return
+    links = "".join(f"{f'{m}Mbit ms':>12}" for m in LINKS_MBIT)
+    print(f"{'payload':<38}{'coding':<9}{'lvl':>4}{'stream':>7}{'bytes':>11}{'ratio':>7}{'cpu ms':>9}{links}")
+    for r in results:
+        totals = "".join(f"{v:>12}" for v in r["total_ms"].values())
+        print(f"{r['payload']:<38}{r['coding']:<9}{r['level']:>4}{'y' if r['streamed'] else '':>7}"
+              f"{r['bytes']:>11}{r['ratio']:>7}{r['compress_ms']:>9}{totals}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Rows/second for act_table_full responses: ORM + jsonable_encoder vs. Core rows + orjson.
+
+    python benchmarks/bench_serialization.py [--rows 20000] [--repeat 5] [--json]
+
+Loads synthetic act_table_full rows into an in-memory SQLite database and times
+the full fetch-and-serialize path of a listing endpoint both ways.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.models import ActTableFull  # noqa: E402
+from app.rows import RowsResponse, fetch_rows  # noqa: E402
+
+
+def load(engine, rows: int):
+    table = ActTableFull.__table__
+    for column in table.columns:
+        column.server_default = None
+    table.create(engine)
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(insert(table), [{
+            "act_id": i, "struct_id": rng.randrange(1, 5000), "target_id": rng.randrange(1, 3000),
+            "target_name": "Cytochrome P450 3A4", "target_class": "Enzyme", "accession": "P08684",
+            "gene": "CYP3A4", "swissprot": "CP3A4_HUMAN", "act_value": rng.uniform(4, 10), "act_unit": None,
+            "act_type": rng.choice(["IC50", "Ki", "Kd", "EC50"]), "act_comment": None, "act_source": "CHEMBL",
+            "relation": "=", "moa": rng.choice([None, 1]), "moa_source": None,
+            "act_source_url": f"https://www.ebi.ac.uk/chembl/compound/inspect/CHEMBL{i}", "moa_source_url": None,
+            "action_type": None, "first_in_class": None, "tdl": "Tclin", "act_ref_id": None, "moa_ref_id": None,
+        } for i in range(1, rows + 1)])
+
+
+def orm_path(engine, rows: int) -> int:
+    with Session(engine) as db:
+        result = db.query(ActTableFull).offset(0).limit(rows).all()
+        return len(JSONResponse(jsonable_encoder(result)).body)
+
+
+def core_path(engine, rows: int) -> int:
+    with Session(engine) as db:
+        result = fetch_rows(db, select(ActTableFull.__table__).offset(0).limit(rows))
+        return len(RowsResponse(result).body)
+
+
+def timed(fn, engine, rows: int, repeat: int) -> dict:
+    fn(engine, rows)  # warm up
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = fn(engine, rows)
+        best = min(best, time.perf_counter() - start)
+    return {"seconds": round(best, 4), "rows_per_second": round(rows / best), "bytes": size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+    engine = create_engine("sqlite://")
+    load(engine, args.rows)
+    results = {"rows": args.rows,
+               "orm_jsonable_encoder": timed(orm_path, engine, args.rows, args.repeat),
+               "core_orjson": timed(core_path, engine, args.rows, args.repeat)}
+    results["speedup"] = round(results["orm_jsonable_encoder"]["seconds"] / results["core_orjson"]["seconds"], 2)
+    if args.json:
+        print(json.dumps(results, indent=1))
+        return
+    for name in ("orm_jsonable_encoder", "core_orjson"):
+        r = results[name]
+        print(f"{name:<22}{r['rows_per_second']:>12} rows/s{r['seconds']:>10} s{r['bytes']:>12} bytes")
+    print(f"speedup {results['speedup']}x")
+
+
+if __name__ == "__main__":
+    main()
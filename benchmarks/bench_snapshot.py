@@ -0,0 +1,83 @@
+"""Latency of the table route queries: Postgres vs. a read-only snapshot file.
+
+    python benchmarks/bench_snapshot.py --snapshot drugcentral.sqlite \\
+        [--postgres postgresql://user@host/drugcentral] [--repeat 50] [--json]
+
+Runs each generated table route's statement (listing, exact and substring
+lookups) against every backend given, with lookup values sampled from the
+snapshot, and reports p50/p95 milliseconds per route and backend. Build the
+snapshot first with ``python -m app.snapshot``.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy import create_engine, select  # noqa: E402
+
+from app.snapshot import read_only_engine  # noqa: E402
+from app.table_routes import CONTAINS, ROW_CAP, TABLE_ROUTES, list_statement, lookup_statement  # noqa: E402
+
+
+def cases(sample_engine):
+    """(route, statement, params) for every table route, with values taken from the data."""
+    out = []
+    with sample_engine.connect() as conn:
+        for entry in TABLE_ROUTES:
+            table = entry.model.__table__
+            out.append((f"/{table.name}", list_statement(table), {"skip": 0, "limit": 10}))
+            for column, match in entry.lookups:
+                value = conn.execute(select(table.c[column]).where(table.c[column].is_not(None)).limit(1)).scalar()
+                if value is None:
+                    continue
+                if match == CONTAINS:
+                    value = f"%{str(value).strip()[:4]}%"
+                out.append((f"/{table.name}/{column}", lookup_statement(table, column, match),
+                            {"value": value, "limit": ROW_CAP + 1}))
+    return out
+
+
+def measure(engine, stmt, params, repeat: int) -> dict:
+    timings = []
+    with engine.connect() as conn:
+        conn.execute(stmt, params).all()  # warm up
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.execute(stmt, params).all()
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {"p50_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--snapshot", required=True, help="snapshot file built by `python -m app.snapshot`")
+    parser.add_argument("--postgres", help="SQLAlchemy URL of the source database")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+    backends = {"snapshot": read_only_engine(args.snapshot)}
+    if args.postgres:
+        backends["postgres"] = create_engine(args.postgres)
+    results = []
+    for route, stmt, params in cases(backends["snapshot"]):
+        row = {"route": route}
+        for name, engine in backends.items():
+            row[name] = measure(engine, stmt, params, args.repeat)
+        results.append(row)
+    if args.json:
+        print(json.dumps(results, indent=1))
+        return
+    header = "".join(f"{name + ' p50':>16}{name + ' p95':>16}" for name in backends)
+    print(f"{'route':<44}{header}")
+    for row in results:
+        print(f"{row['route']:<44}" + "".join(f"{row[n]['p50_ms']:>16}{row[n]['p95_ms']:>16}" for n in backends))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Replay a weighted endpoint mix against the DrugCentral API and report per-endpoint latency.
+
+    python benchmarks/replay.py --db synthetic.sqlite [--requests 5000] [--concurrency 8] [--out report.json]
+    python benchmarks/replay.py --db postgresql://user@localhost/dc_bench --url http://localhost:8000
+
+The mix covers id lookups, substring searches, listings and deep offsets on
+the table routes, plus the approval, Orange Book, DOID and drug-drug
+interaction endpoints. Lookup values (ids, name fragments, page offsets) are
+sampled from ``--db``,
+normally a database written by ``synthetic_data.py``. Without ``--url`` the app
+is served in process from ``--db``, which must then be a SQLite file (it is
+opened as ``DRUGCENTRAL_SNAPSHOT``); with ``--url`` requests go to a running
+server backed by the same data. The JSON report has throughput and
+p50/p95/p99 milliseconds per endpoint and for the whole run.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy import create_engine, func, select  # noqa: E402
+
+from app.tables import drugcentral_tables  # noqa: E402
+
+# (endpoint, kind, weight, source); kind picks how the path is filled in, from
+# values of the source "table.column" (or the row count of the source table)
+MIX = [
+    ("/structures/id/{}", "id", 12, "structures.id"),
+    ("/act_table_full/struct_id/{}", "id", 10, "act_table_full.struct_id"),
+    ("/omop_relationship/struct_id/{}", "id", 8, "omop_relationship.struct_id"),
+    ("/identifier/struct_id/{}", "id", 6, "identifier.struct_id"),
+    ("/product/id/{}", "id", 6, "product.id"),
+    ("/synonyms/id/{}", "id", 5, "synonyms.id"),
+    ("/structures/name/{}", "search", 10, "structures.name"),
+    ("/act_table_full/gene/{}", "search", 6, "act_table_full.gene"),
+    ("/omop_relationship/concept_name/{}", "search", 6, "omop_relationship.concept_name"),
+    ("/product/product_name/{}", "search", 6, "product.product_name"),
+    ("/synonyms/name/{}", "search", 4, "synonyms.name"),
+    ("/structures", "list", 5, "structures"),
+    ("/act_table_full", "list", 4, "act_table_full"),
+    ("/product", "list", 3, "product"),
+    ("/omop_relationship", "offset", 3, "omop_relationship"),
+    ("/product", "offset", 3, "product"),
+    ("/act_table_full", "offset", 3, "act_table_full"),
+    ("/approvals/{}", "id", 3, "approval.struct_id"),
+    ("/approvals?agency={}", "id", 1, "approval.type"),
+    ("/orangebook/{}", "id", 3, "struct2obprod.struct_id"),
+    ("/doid/{}", "id", 2, "doid.doid"),
+    ("/doid/{}/drugs", "id", 2, "doid.doid"),
+    ("/ddi/check", "ddi", 3, "struct2drgclass.struct_id"),
+]
+SAMPLE_SIZE = 500
+PAGE_SIZE = 100
+DDI_LIST_SIZES = (2, 3, 5)
+
+
+def sample_values(engine, seed: int) -> dict:
+    """source -> candidate path values (ids, 3-5 character name fragments) or table row count."""
+    tables = {t.name: t for t in drugcentral_tables()}
+    rng = random.Random(seed)
+    values = {}
+    with engine.connect() as conn:
+        for _, kind, _, source in MIX:
+            if kind in ("list", "offset"):
+                values[source] = conn.execute(select(func.count()).select_from(tables[source])).scalar()
+                continue
+            table_name, column = source.split(".")
+            col = tables[table_name].c[column]
+            found = conn.execute(select(col).where(col.is_not(None)).distinct().limit(SAMPLE_SIZE * 4)).scalars().all()
+            found = rng.sample(found, min(SAMPLE_SIZE, len(found)))
+            if kind == "search":
+                fragments = []
+                for text in found:
+                    text = str(text).strip()
+                    width = min(len(text), rng.randint(3, 5))
+                    start = rng.randint(0, len(text) - width)
+                    fragments.append(text[start:start + width])
+                found = fragments
+            values[(source, kind)] = found
+    return values
+
+
+def plan(values: dict, count: int, seed: int):
+    """``count`` (endpoint label, method, path, json body) requests drawn from MIX by weight."""
+    rng = random.Random(seed)
+    entries = [e for e in MIX if values.get(e[3] if e[1] in ("list", "offset") else (e[3], e[1]))]
+    picks = rng.choices(entries, weights=[e[2] for e in entries], k=count)
+    out = []
+    for endpoint, kind, _, source in picks:
+        if kind == "list":
+            out.append((f"{endpoint}?limit={PAGE_SIZE}", "GET", f"{endpoint}?skip=0&limit={PAGE_SIZE}", None))
+        elif kind == "offset":
+            rows = values[source]
+            skip = rng.randint(rows // 2, max(rows - PAGE_SIZE, rows // 2))
+            out.append((f"{endpoint}?skip=deep", "GET", f"{endpoint}?skip={skip}&limit={PAGE_SIZE}", None))
+        elif kind == "ddi":
+            sample = values[(source, kind)]
+            drugs = rng.sample(sample, min(len(sample), rng.choice(DDI_LIST_SIZES)))
+            out.append((endpoint, "POST", endpoint, {"drugs": drugs}))
+        else:
+            value = quote(str(rng.choice(values[(source, kind)])), safe="")
+            out.append((endpoint, "GET", endpoint.format(value), None))
+    return out
+
+
+def percentile(sorted_ms, q: float) -> float:
+    return round(sorted_ms[min(len(sorted_ms) - 1, int(len(sorted_ms) * q))], 3)
+
+
+def summarize(timings, statuses, elapsed: float) -> dict:
+    timings = sorted(timings)
+    return {
+        "requests": len(timings),
+        "errors": sum(1 for s in statuses if s >= 500),
+        "not_found": sum(1 for s in statuses if s == 404),
+        "throughput_rps": round(len(timings) / elapsed, 2) if elapsed else None,
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p50_ms": percentile(timings, 0.50),
+        "p95_ms": percentile(timings, 0.95),
+        "p99_ms": percentile(timings, 0.99),
+        "max_ms": round(timings[-1], 3),
+    }
+
+
+def make_client(args):
+    if args.url:
+        import httpx
+        return lambda: httpx.Client(base_url=args.url, timeout=60)
+    os.environ["DRUGCENTRAL_SNAPSHOT"] = args.db
+    from fastapi.testclient import TestClient
+
+    from app import main as app_main
+    app_main.warm_caches()  # startup runs here, so its cache builds stay out of the measurement
+    return lambda: TestClient(app_main.app)
+
+
+def replay(new_client, requests, concurrency: int):
+    local = threading.local()
+    results = [None] * len(requests)
+
+    def run(index):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = new_client()
+        label, method, path, body = requests[index]
+        start = time.perf_counter()
+        response = client.request(method, path, json=body)
+        results[index] = (label, (time.perf_counter() - start) * 1000, response.status_code)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(run, range(len(requests))))
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", required=True, help="SQLite file or SQLAlchemy URL holding the benchmark data")
+    parser.add_argument("--url", help="base URL of a running server; default serves --db in process")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200, help="requests sent before measuring")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    if not args.url and "://" in args.db:
+        parser.error("serving in process needs a SQLite file for --db; pass --url for other databases")
+    if "://" not in args.db and not os.path.isfile(args.db):
+        parser.error(f"{args.db} does not exist; generate it with benchmarks/synthetic_data.py first")
+
+    db_url = args.db if "://" in args.db else f"sqlite:///{args.db}"
+    engine = create_engine(db_url)
+    values = sample_values(engine, args.seed)
+    engine.dispose()
+    new_client = make_client(args)
+    replay(new_client, plan(values, args.warmup, args.seed + 1), args.concurrency)
+    results, elapsed = replay(new_client, plan(values, args.requests, args.seed), args.concurrency)
+
+    by_endpoint = {}
+    for label, ms, status in results:
+        by_endpoint.setdefault(label, ([], []))
+        by_endpoint[label][0].append(ms)
+        by_endpoint[label][1].append(status)
+    report = {
+        "target": args.url or "in-process",
+        "database": engine.url.render_as_string(hide_password=True),
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+        "python": platform.python_version(),
+        "elapsed_s": round(elapsed, 3),
+        "overall": summarize([r[1] for r in results], [r[2] for r in results], elapsed),
+        "endpoints": {label: summarize(ms, statuses, elapsed)
+                      for label, (ms, statuses) in sorted(by_endpoint.items())},
+    }
+    text = json.dumps(report, indent=1)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,474 @@
+"""Generate a synthetic DrugCentral database for benchmarking.
+
+    python benchmarks/synthetic_data.py synthetic.sqlite [--scale 1] [--seed 42]
+    python benchmarks/synthetic_data.py postgresql://user@localhost/dc_bench --scale 10
+
+Creates every table in ``app.tables`` (columns, primary keys and the unique
+constraints of the real schema) and fills the ones the API reads: the table
+routes, approvals, drug classes and interactions, Disease Ontology terms and
+cross-references, and Orange Book products, patents and exclusivities. Row
+counts, key fan-out and text vocabularies resemble a DrugCentral release:
+popular names, targets and annotations follow bounded Zipf laws over their
+ranks, and the build fails if the most common value of a column in
+``MAX_TOP_SHARE`` takes more than its share of the rows.
+
+``--scale 1`` is roughly release-sized (about 360k rows). ``--scale N``, a
+whole number (1 is the smallest dataset), multiplies the per-drug tables (structures and everything keyed by struct_id,
+products, Orange Book); vocabularies a release does not grow with more drugs
+(targets and their GO/keyword annotations, ATC codes, drug classes and their
+interactions, conditions and DOID terms) keep their scale-1 size. Labels,
+pKa and properties are left empty.
+
+A ``.sqlite`` file can be served directly with ``DRUGCENTRAL_SNAPSHOT``; drive
+it with ``replay.py``.
+"""
+import argparse
+import collections
+import datetime
+import functools
+import itertools
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy import Index, UniqueConstraint, create_engine, insert, text  # noqa: E402
+
+from app.snapshot import create_views, drop_views, lookup_indexes, snapshot_metadata  # noqa: E402
+from app.tables import drugcentral_tables  # noqa: E402
+
+CHUNK = 5000
+
+# rows per table at scale 1, multiplied by --scale
+SCALED_ROWS = {
+    "structures": 5000,
+    "synonyms": 40000,
+    "identifier": 60000,
+    "act_table_full": 25000,
+    "omop_relationship": 40000,
+    "product": 45000,
+    "struct2atc": 4500,
+    "struct2drgclass": 12000,
+    "ob_product": 12000,
+    "ob_patent": 5000,
+    "ob_exclusivity": 2000,
+}
+# vocabularies that keep their size at every scale
+FIXED_ROWS = {
+    "target_dictionary": 3000,
+    "target_component": 3500,
+    "target_go": 15000,
+    "target_keyword": 1200,
+    "tdgo2tc": 40000,
+    "tdkey2tc": 12000,
+    "atc": 5500,
+    "drug_class": 1500,
+    "ddi": 3000,
+    "ddi_references": 40,
+}
+
+# Zipf exponents of the skewed foreign keys and names; a release's most common
+# generic name, target, GO term or condition is on a few percent of the rows
+NAME_EXPONENT = 0.8
+TARGET_EXPONENT = 0.7
+ANNOTATION_EXPONENT = 0.8
+CONDITION_EXPONENT = 0.7
+CLASS_EXPONENT = 0.4
+CATEGORY_EXPONENT = 1.0  # short lists such as routes, where one value (ORAL) is the usual one
+# upper bound on the share of rows taken by the most common value, checked on every build
+MAX_TOP_SHARE = {
+    "product": {"generic_name": 0.05, "product_name": 0.05},
+    "act_table_full": {"target_id": 0.05},
+    "tdgo2tc": {"go_id": 0.05},
+    "tdkey2tc": {"tdkey_id": 0.08},
+    "omop_relationship": {"concept_id": 0.08},
+    "struct2drgclass": {"drug_class_id": 0.02},
+}
+
+STEMS = ["pril", "sartan", "olol", "statin", "vir", "tinib", "mab", "azole", "cillin", "dronate", "profen",
+         "oxacin", "semide", "dipine", "gliptin", "parin", "setron", "tidine", "zepam", "triptan"]
+SYLLABLES = ["ab", "ca", "de", "flu", "ga", "ler", "mi", "no", "pra", "quin", "ro", "sa", "te", "va", "xi", "zo",
+             "bel", "cor", "dan", "ep", "iso", "lo", "met", "ne", "os", "pi", "ri", "ta", "u", "ve"]
+SALTS = ["hydrochloride", "sodium", "mesylate", "sulfate", "maleate", "citrate", "acetate", "potassium",
+         "tartrate", "fumarate"]
+CODE_PREFIXES = ["AB", "BAY", "CGP", "GSK", "LY", "MK", "RO", "SCH", "SK&F", "UK"]
+ID_TYPES = ["ChEMBL_ID", "DRUGBANK_ID", "PUBCHEM_CID", "UNII", "CHEBI", "KEGG_DRUG", "MESH_DESCRIPTOR_UI",
+            "RXNORM", "SNOMEDCT_US", "NDDF", "VANDF", "MMSL", "IUPHAR_LIGAND_ID", "INN_ID", "VUID",
+            "SECONDARY_CAS_RN", "NUI", "PDB_CHEM_ID", "UMLSCUI", "MESH_SUPPLEMENTAL_RECORD_UI"]
+TARGET_CLASSES = ["Enzyme", "GPCR", "Ion channel", "Kinase", "Nuclear hormone receptor", "Transporter",
+                  "Membrane receptor", "Transcription factor", "Cytokine", "Structural", "Unclassified"]
+ORGANISMS = ["Homo sapiens"] * 8 + ["Rattus norvegicus", "Mus musculus", "Escherichia coli", "HIV-1"]
+ACT_TYPES = ["IC50", "Ki", "Kd", "EC50", "ED50", "AC50", "Kb", "pA2"]
+ACT_SOURCES = ["CHEMBL", "IUPHAR", "DRUG MATRIX", "WOMBAT-PK", "PDSP", "KEGG DRUG", "SCIENTIFIC LITERATURE"]
+ACTION_TYPES = ["INHIBITOR", "ANTAGONIST", "AGONIST", "BLOCKER", "MODULATOR", "OPENER", "ACTIVATOR"]
+TDLS = ["Tclin", "Tchem", "Tbio", "Tdark"]
+RELATIONSHIPS = ["indication", "contraindication", "off-label use", "symptomatic treatment", "reduce risk",
+                 "diagnosis"]
+CONDITIONS = ["Hypertensive disorder", "Diabetes mellitus", "Asthma", "Depressive disorder",
+              "Rheumatoid arthritis", "Kidney disease", "Heart failure", "Migraine", "Epilepsy",
+              "Pregnancy", "Hepatic failure", "Psoriasis", "Schizophrenia", "Osteoporosis", "Gout",
+              "Parkinson's disease", "Hyperlipidemia", "Angina pectoris", "Bacterial infection", "Glaucoma"]
+CONDITION_QUALIFIERS = ["", "Acute ", "Chronic ", "Severe ", "Familial ", "Drug-induced ", "Juvenile ",
+                        "Recurrent ", "Secondary ", "Refractory ", "Mild ", "Congenital "]
+CONDITION_VARIANTS = ["", " type I", " type II", " with complication", " in remission", " of childhood"]
+SEMANTIC_TYPES = ["T047", "T191", "T046", "T184", "T033", "T048"]
+ROUTES = ["ORAL", "INTRAVENOUS", "TOPICAL", "SUBCUTANEOUS", "INTRAMUSCULAR", "OPHTHALMIC", "INHALATION",
+          "TRANSDERMAL", "NASAL", "RECTAL"]
+FORMS = ["TABLET", "CAPSULE", "INJECTION, SOLUTION", "CREAM", "TABLET, FILM COATED", "SUSPENSION",
+         "SOLUTION", "OINTMENT", "AEROSOL, METERED", "PATCH"]
+GO_TYPES = ["P", "F", "C"]
+KEYWORD_CATEGORIES = ["Biological process", "Cellular component", "Domain", "Ligand", "Molecular function",
+                      "PTM", "Disease"]
+CLASS_SOURCES = ["MeSH", "FDA EPC", "FDA MoA", "FDA PE", "FDA CS", "CHEBI"]
+CLASS_KINDS = ["Inhibitors", "Agonists", "Antagonists", "Blockers", "Modulators", "Analogs"]
+# approval_type.descr, and the share of drugs each agency has approved
+AGENCIES = [("FDA", 0.55), ("EMA", 0.3), ("PMDA", 0.2), ("Health Canada", 0.15), ("TGA", 0.08),
+            ("Swissmedic", 0.06)]
+APPLICANTS = ["PFIZER", "MERCK", "NOVARTIS", "ROCHE", "SANOFI", "GSK", "ASTRAZENECA", "ABBVIE", "BAYER",
+              "LILLY", "TEVA", "MYLAN", "SANDOZ", "AUROBINDO", "LUPIN"]
+DDI_RISKS = ["Major", "Moderate", "Minor"]
+EXCLUSIVITY_CODES = ["NCE", "ODE", "NP", "M", "I", "PED", "GAIN"]
+PATENT_USE_CODES = [None, None, "U-1", "U-12", "U-141", "U-259", "U-1043"]
+
+
+@functools.lru_cache(maxsize=None)
+def _zipf_weights(count: int, exponent: float):
+    """Cumulative weights of ranks 1..count, rank k weighing 1 / k ** exponent."""
+    return list(itertools.accumulate(1 / k ** exponent for k in range(1, count + 1)))
+
+
+def _zipf_choice(rng: random.Random, items, exponent: float):
+    """An item of ``items`` drawn by a Zipf law over their ranks, the first being the most common."""
+    return rng.choices(items, cum_weights=_zipf_weights(len(items), exponent))[0]
+
+
+def _check_skew(table: str, rows):
+    """Fail the build if a MAX_TOP_SHARE column's most common value is over its share of the rows."""
+    for column, limit in MAX_TOP_SHARE.get(table, {}).items():
+        value, count = collections.Counter(row[column] for row in rows).most_common(1)[0]
+        if count > limit * len(rows):
+            raise ValueError(f"{table}.{column} = {value!r} is on {count} of {len(rows)} rows, over {limit:.0%}")
+
+
+def _unique(taken: set, make):
+    """Call ``make()`` until it returns a value not in ``taken`` (strings compared case-insensitively)."""
+    while True:
+        value = make()
+        key = value.lower() if isinstance(value, str) else value
+        if key not in taken:
+            taken.add(key)
+            return value
+
+
+def _drug_name(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))) + rng.choice(STEMS)
+
+
+def _inchikey(rng: random.Random) -> str:
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return "".join(rng.choice(letters) for _ in range(14)) + "-" + \
+        "".join(rng.choice(letters) for _ in range(8)) + "SA-N"
+
+
+def _date(rng: random.Random, first_year: int, last_year: int) -> datetime.date:
+    start = datetime.date(first_year, 1, 1).toordinal()
+    return datetime.date.fromordinal(rng.randint(start, datetime.date(last_year, 12, 31).toordinal()))
+
+
+def _synonyms(rng: random.Random, names, count: int):
+    """Unique names and lower-cased names: each drug's own, then salt forms, research codes and brand-like names."""
+    taken = {name.lower() for name in names}
+    rows = [{"name": name, "id": i, "preferred_name": 1} for i, name in enumerate(names, 1)]
+    while len(rows) < count:
+        struct_id = rng.randint(1, len(names))
+        kind = rng.random()
+        if kind < 0.45:
+            name = f"{names[struct_id - 1]} {rng.choice(SALTS)}"
+        elif kind < 0.75:
+            name = f"{rng.choice(CODE_PREFIXES)}-{rng.randint(100, 999999)}"
+        else:
+            name = _drug_name(rng).capitalize() + rng.choice(["", "ex", "il", "on", "a"])
+        if name.lower() not in taken:
+            taken.add(name.lower())
+            rows.append({"name": name, "id": struct_id, "preferred_name": None})
+    rows = rows[:count]
+    for syn_id, row in enumerate(rows, 1):
+        row.update(syn_id=syn_id, parent_id=None, lname=row["name"].lower())
+    return rows
+
+
+def _ob_key(product: dict) -> dict:
+    return {"appl_type": product["appl_type"], "appl_no": product["appl_no"], "product_no": product["product_no"]}
+
+
+def generate(rng: random.Random, scale: int):
+    """Yield (table name, list of rows) in insert order."""
+    n = dict(FIXED_ROWS, **{table: count * scale for table, count in SCALED_ROWS.items()})
+    yield "dbversion", [{"version": 1, "dtime": datetime.datetime(2024, 1, 1)}]
+    yield "id_type", [{"id": i, "type": t, "description": None, "url": None} for i, t in enumerate(ID_TYPES, 1)]
+    yield "target_class", [{"l1": c, "id": i} for i, c in enumerate(TARGET_CLASSES, 1)]
+    yield "approval_type", [{"id": i, "descr": agency} for i, (agency, _) in enumerate(AGENCIES, 1)]
+
+    taken_names, taken_cas = set(), set()
+    names = []
+    structures = []
+    for i in range(1, n["structures"] + 1):
+        name = _unique(taken_names, lambda: _drug_name(rng))
+        names.append(name)
+        structures.append({
+            "cd_id": i, "id": i, "enhanced_stereo": False, "name": name,
+            "cd_formula": f"C{rng.randint(5, 60)}H{rng.randint(5, 90)}N{rng.randint(0, 8)}O{rng.randint(0, 12)}",
+            "cd_molweight": round(rng.uniform(100, 900), 3), "clogp": round(rng.gauss(2.5, 2), 3),
+            "alogs": round(rng.gauss(-3, 1.5), 3), "tpsa": round(rng.uniform(0, 200), 2),
+            "cas_reg_no": _unique(taken_cas, lambda: f"{rng.randint(50, 9999999)}-{rng.randint(10, 99)}-"
+                                                     f"{rng.randint(0, 9)}"),
+            "lipinski": rng.randint(0, 4), "no_formulations": rng.randint(0, 40), "stem": name[-5:],
+            "arom_c": rng.randint(0, 24), "sp3_c": rng.randint(0, 30), "sp2_c": rng.randint(0, 12),
+            "sp_c": rng.randint(0, 2), "halogen": rng.randint(0, 4), "hetero_sp2_c": rng.randint(0, 6),
+            "rotb": rng.randint(0, 15), "o_n": rng.randint(0, 14), "oh_nh": rng.randint(0, 6),
+            "smiles": "C" * rng.randint(3, 12) + "(=O)N" + "c1ccccc1" * rng.randint(0, 2),
+            "inchikey": _inchikey(rng), "rgb": rng.randint(0, 30), "fda_labels": rng.randint(0, 200),
+            "status": "OK",
+        })
+    yield "structures", structures
+    struct_ids = range(1, n["structures"] + 1)
+
+    yield "synonyms", _synonyms(rng, names, n["synonyms"])
+    taken_identifiers = set()
+    identifiers = []
+    for i in range(1, n["identifier"] + 1):
+        identifier, id_type, struct_id = _unique(taken_identifiers, lambda: (
+            f"{rng.choice(['CHEMBL', 'DB', 'CID', 'D'])}{rng.randint(1, 10**7)}", rng.choice(ID_TYPES),
+            rng.choice(struct_ids)))
+        identifiers.append({"id": i, "identifier": identifier, "id_type": id_type, "struct_id": struct_id,
+                            "parent_match": None})
+    yield "identifier", identifiers
+
+    taken_genes, taken_accessions = set(), set()
+    components = []
+    for i in range(1, n["target_component"] + 1):
+        gene = _unique(taken_genes, lambda: f"{rng.choice('ABCDEFGHKLMNPRST')}{rng.choice('ABCDEFGHKLMNPRST')}"
+                                            f"{rng.choice('ABCDKLPRT')}{rng.randint(1, 20)}")
+        accession = _unique(taken_accessions, lambda: f"{rng.choice('OPQ')}{rng.randint(10000, 99999)}")
+        components.append({"id": i, "accession": accession, "swissprot": f"{gene}_HUMAN",
+                           "organism": rng.choice(ORGANISMS), "name": f"{gene} protein", "gene": gene,
+                           "geneid": rng.randint(1, 10**6), "tdl": rng.choice(TDLS)})
+    yield "target_component", components
+    targets = [{"id": i, "name": f"{components[(i - 1) % len(components)]['name']} complex" if i % 9 == 0
+                else components[(i - 1) % len(components)]["name"],
+                "target_class": rng.choice(TARGET_CLASSES), "protein_components": 1,
+                "protein_type": "SINGLE PROTEIN", "tdl": rng.choice(TDLS)}
+               for i in range(1, n["target_dictionary"] + 1)]
+    yield "target_dictionary", targets
+    yield "td2tc", [{"target_id": t["id"], "component_id": (t["id"] - 1) % len(components) + 1} for t in targets]
+
+    go_ids = [f"GO:{i:07d}" for i in range(1, n["target_go"] + 1)]
+    yield "target_go", [{"id": g, "term": f"{rng.choice(['regulation of', 'response to', 'binding of'])} "
+                         f"{rng.choice(CONDITIONS).lower()} pathway {i}", "type": rng.choice(GO_TYPES)}
+                        for i, g in enumerate(go_ids)]
+    keyword_ids = [f"KW-{i:04d}" for i in range(1, n["target_keyword"] + 1)]
+    yield "target_keyword", [{"id": k, "descr": None, "category": rng.choice(KEYWORD_CATEGORIES),
+                              "keyword": f"{rng.choice(SYLLABLES).capitalize()}{rng.choice(STEMS)} {i}"}
+                             for i, k in enumerate(keyword_ids)]
+    yield "tdgo2tc", [{"id": i, "go_id": _zipf_choice(rng, go_ids, ANNOTATION_EXPONENT),
+                       "component_id": rng.randint(1, len(components))}
+                      for i in range(1, n["tdgo2tc"] + 1)]
+    yield "tdkey2tc", [{"id": i, "tdkey_id": _zipf_choice(rng, keyword_ids, ANNOTATION_EXPONENT),
+                        "component_id": rng.randint(1, len(components))} for i in range(1, n["tdkey2tc"] + 1)]
+
+    activities = []
+    for i in range(1, n["act_table_full"] + 1):
+        target = _zipf_choice(rng, targets, TARGET_EXPONENT)
+        component = components[(target["id"] - 1) % len(components)]
+        moa = rng.random() < 0.15
+        activities.append({
+            "act_id": i, "struct_id": rng.choice(struct_ids), "target_id": target["id"],
+            "target_name": target["name"], "target_class": target["target_class"],
+            "accession": component["accession"], "gene": component["gene"], "swissprot": component["swissprot"],
+            "act_value": round(rng.uniform(4, 10), 2), "act_unit": None, "act_type": rng.choice(ACT_TYPES),
+            "act_comment": None, "act_source": rng.choice(ACT_SOURCES), "relation": rng.choice(["=", "=", "<", ">"]),
+            "moa": 1 if moa else None, "moa_source": rng.choice(ACT_SOURCES) if moa else None,
+            "act_source_url": f"https://www.ebi.ac.uk/chembl/compound/inspect/CHEMBL{rng.randint(1, 10**6)}",
+            "moa_source_url": None, "action_type": rng.choice(ACTION_TYPES) if moa else None,
+            "first_in_class": int(moa and rng.random() < 0.1), "tdl": target["tdl"], "act_ref_id": None,
+            "moa_ref_id": None, "organism": component["organism"],
+        })
+    yield "act_table_full", activities
+
+    # conditions are shared by omop_relationship and the Disease Ontology, linked by UMLS CUI
+    conditions = [f"{qualifier}{base}{variant}" for base in CONDITIONS for qualifier in CONDITION_QUALIFIERS
+                  for variant in CONDITION_VARIANTS]
+    rng.shuffle(conditions)
+    cuis = rng.sample(range(10**6, 10**7), len(conditions))
+    concept_ids = rng.sample(range(10**5, 10**7), len(conditions))
+    condition_ranks = range(len(conditions))
+    omop_keys, omop = set(), []
+    while len(omop) < n["omop_relationship"]:
+        struct_id, c = rng.choice(struct_ids), _zipf_choice(rng, condition_ranks, CONDITION_EXPONENT)
+        if (struct_id, concept_ids[c]) in omop_keys:
+            continue
+        omop_keys.add((struct_id, concept_ids[c]))
+        omop.append({
+            "id": len(omop) + 1, "struct_id": struct_id, "concept_id": concept_ids[c],
+            "relationship_name": _zipf_choice(rng, RELATIONSHIPS, CATEGORY_EXPONENT), "concept_name": conditions[c],
+            "umls_cui": f"C{cuis[c]}", "snomed_full_name": None, "cui_semantic_type": rng.choice(SEMANTIC_TYPES),
+            "snomed_conceptid": concept_ids[c] * 10 + 1,
+        })
+    yield "omop_relationship", omop
+
+    doids = [(i, c) for i, c in enumerate(range(len(conditions)), 1) if rng.random() < 0.7]
+    yield "doid", [{"id": i, "label": conditions[c].lower(), "doid": f"DOID:{1000 + i}",
+                    "url": f"http://purl.obolibrary.org/obo/DOID_{1000 + i}"} for i, c in doids]
+    xrefs = []
+    for i, c in doids:
+        xrefs.append({"doid": f"DOID:{1000 + i}", "source": "UMLS_CUI", "xref": f"C{cuis[c]}"})
+        xrefs.append({"doid": f"DOID:{1000 + i}", "source": "MESH", "xref": f"D{cuis[c] % 10**6:06d}"})
+        if rng.random() < 0.5:
+            xrefs.append({"doid": f"DOID:{1000 + i}", "source": "ICD10CM",
+                          "xref": f"{rng.choice('EFGIJKMN')}{rng.randint(10, 99)}.{i % 10}"})
+    yield "doid_xref", [dict(x, id=i) for i, x in enumerate(xrefs, 1)]
+
+    taken_ndc = set()
+    yield "product", [{
+        "id": i, "ndc_product_code": _unique(taken_ndc, lambda: f"{rng.randint(1000, 99999)}-{rng.randint(100, 9999)}"),
+        "form": rng.choice(FORMS), "generic_name": _zipf_choice(rng, names, NAME_EXPONENT).upper(),
+        "product_name": (_zipf_choice(rng, names, NAME_EXPONENT).capitalize()
+                         + rng.choice(["", " XR", " ODT", " Forte"])),
+        "route": _zipf_choice(rng, ROUTES, CATEGORY_EXPONENT),
+        "marketing_status": rng.choice(["ANDA", "NDA", "BLA", "OTC"]),
+        "active_ingredient_count": rng.choice([1, 1, 1, 2]),
+    } for i in range(1, n["product"] + 1)]
+
+    taken_codes = set()
+    atc = []
+    for i in range(1, n["atc"] + 1):
+        l1 = rng.choice("ABCDGHJLMNPRSV")
+        l2, l3, l4 = f"{l1}{rng.randint(1, 16):02d}", rng.choice("ABCDEFGHX"), rng.choice("ABCDEFGX")
+        code = _unique(taken_codes, lambda: f"{l2}{l3}{l4}{rng.randint(1, 99):02d}")
+        atc.append({"id": i, "code": code, "chemical_substance": rng.choice(names),
+                    "l1_code": l1, "l1_name": f"GROUP {l1}", "l2_code": l2, "l2_name": f"{l2} AGENTS",
+                    "l3_code": l2 + l3, "l3_name": f"{l2}{l3} AGENTS", "l4_code": l2 + l3 + l4,
+                    "l4_name": f"{l2}{l3}{l4} AGENTS", "chemical_substance_count": 1})
+    yield "atc", atc
+    atc_pairs = {(rng.choice(struct_ids), rng.choice(atc)["code"]) for _ in range(n["struct2atc"])}
+    yield "struct2atc", [{"struct_id": s, "atc_code": c, "id": i} for i, (s, c) in enumerate(sorted(atc_pairs), 1)]
+
+    taken_classes = set()
+    classes = [_unique(taken_classes, lambda: f"{rng.choice(STEMS).capitalize()} {rng.choice(CLASS_KINDS)} "
+                                              f"{rng.randint(1, 9999)}") for _ in range(n["drug_class"])]
+    yield "drug_class", [{"id": i, "name": name, "is_group": int(i % 10 == 0), "source": rng.choice(CLASS_SOURCES)}
+                         for i, name in enumerate(classes, 1)]
+    class_pairs = {(rng.choice(struct_ids), _zipf_choice(rng, range(1, len(classes) + 1), CLASS_EXPONENT))
+                   for _ in range(n["struct2drgclass"])}
+    yield "struct2drgclass", [{"id": i, "struct_id": s, "drug_class_id": c}
+                              for i, (s, c) in enumerate(sorted(class_pairs), 1)]
+    yield "ddi_risk", [{"id": i, "risk": risk, "ddi_ref_id": ref}
+                       for i, (risk, ref) in enumerate(((r, ref) for r in DDI_RISKS
+                                                        for ref in range(1, n["ddi_references"] + 1)), 1)]
+    ddi_keys = set()
+    while len(ddi_keys) < n["ddi"]:
+        a, b = (_zipf_choice(rng, classes, CLASS_EXPONENT) for _ in range(2))
+        if a != b:
+            ddi_keys.add((a, b, rng.randint(1, n["ddi_references"])))
+    yield "ddi", [{"id": i, "drug_class1": a, "drug_class2": b, "ddi_ref_id": ref,
+                   "ddi_risk": rng.choice(DDI_RISKS), "description": f"{a} may alter the effect of {b}.",
+                   "source_id": f"DDI{i:05d}"} for i, (a, b, ref) in enumerate(sorted(ddi_keys), 1)]
+
+    approvals = []
+    for struct_id in struct_ids:
+        orphan = rng.random() < 0.08
+        first = _date(rng, 1940, 2023)
+        for agency, share in AGENCIES:
+            if rng.random() < share:
+                approvals.append({"id": len(approvals) + 1, "struct_id": struct_id, "type": agency,
+                                  "approval": first + datetime.timedelta(days=rng.randint(0, 3000)),
+                                  "applicant": rng.choice(APPLICANTS), "orphan": orphan})
+    yield "approval", approvals
+
+    ob_products, links = [], set()
+    for i in range(1, n["ob_product"] + 1):
+        struct_id = rng.choice(struct_ids)
+        links.add((struct_id, i))
+        if rng.random() < 0.1:
+            links.add((rng.choice(struct_ids), i))  # combination product
+        appl_type = "N" if rng.random() < 0.3 else "A"
+        ob_products.append({
+            "id": i, "ingredient": names[struct_id - 1].upper(), "applicant": rng.choice(APPLICANTS),
+            "trade_name": names[struct_id - 1].upper() if appl_type == "A" else _drug_name(rng).upper(),
+            "strength": f"{rng.choice([5, 10, 20, 50, 100, 250])}MG", "appl_type": appl_type,
+            "appl_no": f"{(i - 1) // 3 + 10000:06d}", "product_no": f"{(i - 1) % 3 + 1:03d}",
+            "te_code": rng.choice([None, "AB", "AB1", "AP"]), "approval_date": _date(rng, 1982, 2023),
+            "rld": int(appl_type == "N"), "type": rng.choice(["RX", "RX", "OTC", "DISCN"]),
+            "applicant_full_name": None, "dose_form": rng.choice(FORMS),
+            "route": _zipf_choice(rng, ROUTES, CATEGORY_EXPONENT),
+        })
+    yield "ob_product", ob_products
+    yield "struct2obprod", [{"struct_id": s, "prod_id": p, "strength": None} for s, p in sorted(links)]
+    new_drug_products = [p for p in ob_products if p["appl_type"] == "N"]
+    yield "ob_patent", [dict(_ob_key(rng.choice(new_drug_products)), id=i,
+                             patent_no=str(rng.randint(4 * 10**6, 12 * 10**6)),
+                             patent_expire_date=_date(rng, 2000, 2042),
+                             drug_substance_flag=rng.choice([None, "Y"]), drug_product_flag=rng.choice([None, "Y"]),
+                             patent_use_code=rng.choice(PATENT_USE_CODES), delist_flag=None)
+                        for i in range(1, n["ob_patent"] + 1)]
+    yield "ob_exclusivity", [dict(_ob_key(rng.choice(new_drug_products)), id=i,
+                                  exclusivity_code=rng.choice(EXCLUSIVITY_CODES),
+                                  exclusivity_date=_date(rng, 2015, 2035))
+                             for i in range(1, n["ob_exclusivity"] + 1)]
+
+
+def synthetic_metadata():
+    """The snapshot's plain tables plus the real schema's unique constraints, so a violation fails the build."""
+    tables = drugcentral_tables()
+    metadata = snapshot_metadata(tables)
+    for table in tables:
+        copy = metadata.tables[table.name]
+        primary_key = tuple(c.name for c in copy.primary_key.columns)
+        uniques = {tuple(c.name for c in u.columns) for u in table.constraints if isinstance(u, UniqueConstraint)}
+        uniques |= {tuple(c.name for c in i.columns) for i in table.indexes if i.unique}
+        for columns in sorted(uniques - {primary_key}):
+            copy.append_constraint(UniqueConstraint(*columns))
+    return metadata
+
+
+def build(url: str, scale: int = 1, seed: int = 42) -> dict:
+    engine = create_engine(url)
+    metadata = synthetic_metadata()
+    with engine.begin() as conn:
+        drop_views(conn)  # they depend on the tables, which Postgres will not drop under them
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    rng = random.Random(seed)
+    counts = {}
+    with engine.begin() as conn:
+        for table_name, rows in generate(rng, scale):
+            _check_skew(table_name, rows)
+            table = metadata.tables[table_name]
+            for start in range(0, len(rows), CHUNK):
+                conn.execute(insert(table), rows[start:start + CHUNK])
+            counts[table_name] = len(rows)
+        for table_name, column in lookup_indexes():
+            table = metadata.tables[table_name]
+            Index(f"ix_{table_name}_{column}", table.c[column]).create(conn)
+        create_views(conn)
+        conn.execute(text("ANALYZE"))
+    engine.dispose()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic DrugCentral database")
+    parser.add_argument("target", help="SQLite file path or SQLAlchemy URL")
+    parser.add_argument("--scale", type=int, default=1, help="whole-number multiplier for the per-drug tables (1 = release-sized, the smallest)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    url = args.target if "://" in args.target else f"sqlite:///{args.target}"
+    start = time.perf_counter()
+    counts = build(url, args.scale, args.seed)
+    print(f"wrote {sum(counts.values())} rows into {len(counts)} tables in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
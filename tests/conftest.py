@@ -0,0 +1,6 @@
+import os
+import sys
+
+# app.database builds its engine at import; the tests only need one that opens without a server
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,31 @@
+import asyncio
+
+from app.compression import CompressionMiddleware
+
+
+def run(status, headers, body=b"", accept=b"gzip"):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", accept)]}
+    asyncio.run(CompressionMiddleware(app, minimum_size=10)(scope, None, send))
+    return sent[0]["status"], dict(sent[0]["headers"])
+
+
+def test_compresses_with_vary():
+    status, headers = run(200, [(b"content-type", b"application/json")], b"[" + b"1," * 100 + b"1]")
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"Accept-Encoding"
+
+
+def test_not_modified_carries_vary():
+    status, headers = run(304, [(b"etag", b'W/"abc"'), (b"vary", b"Origin")])
+    assert status == 304
+    assert headers[b"vary"] == b"Origin, Accept-Encoding"
+    assert b"content-encoding" not in headers
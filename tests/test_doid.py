@@ -0,0 +1,28 @@
+from app.doid import read_obo_parents
+
+OBO = """format-version: 1.2
+
+[Term]
+id: DOID:2
+is_a: DOID:1 ! disease
+
+[Term]
+id: DOID:3
+is_a: DOID:2 ! child
+is_obsolete: true
+
+[Typedef]
+id: has_part
+is_a: part_of
+
+[Term]
+id: DOID:4
+is_a: DOID:2 ! child
+is_a: DOID:1 ! disease
+"""
+
+
+def test_read_obo_parents(tmp_path):
+    path = tmp_path / "doid.obo"
+    path.write_text(OBO)
+    assert read_obo_parents(str(path)) == [("DOID:2", "DOID:1"), ("DOID:4", "DOID:2"), ("DOID:4", "DOID:1")]
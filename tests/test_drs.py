@@ -0,0 +1,96 @@
+import gzip
+import hashlib
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import drs
+from app import main
+
+DATA = gzip.compress(b"".join(b"%d\trow %d\n" % (i, i) for i in range(200)), mtime=0)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-9", (0, 9)),
+    ("bytes=-10", (90, 99)),
+    ("bytes=-500", (0, 99)),
+    ("bytes=95-", (95, 99)),
+    ("bytes=90-500", (90, 99)),
+    ("bytes=100-", None),
+    ("bytes=100-200", None),
+    ("bytes=-0", None),
+])
+def test_parse_range(header, expected):
+    assert drs.parse_range(header, 100) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=5-3", "bytes=0-1,5-9", "items=0-9", "bytes=a-b", "bytes=-"])
+def test_parse_range_ignored(header):
+    with pytest.raises(ValueError):
+        drs.parse_range(header, 100)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    version_dir = tmp_path / "7"
+    version_dir.mkdir()
+    (version_dir / "atc.tsv.gz").write_bytes(DATA)
+    oid = drs.object_id(7, "atc")
+    manifest = {"version": "7", "objects": {oid: {
+        "id": oid, "name": "atc.tsv.gz", "table": "atc", "version": "7", "rows": 200,
+        "size": len(DATA), "checksums": drs.checksum_file(str(version_dir / "atc.tsv.gz")),
+        "fingerprint": "", "created_time": "2024-01-01T00:00:00+00:00",
+        "mime_type": "application/gzip", "path": "atc.tsv.gz"}}}
+    (version_dir / drs.MANIFEST_NAME).write_text(json.dumps(manifest))
+    monkeypatch.setattr(main, "drs_index", drs.DrsIndex(str(tmp_path)))
+    return TestClient(main.app)
+
+
+URL = "/ga4gh/drs/v1/data/drugcentral.7.atc"
+ETAG = '"' + hashlib.sha256(DATA).hexdigest() + '"'
+
+
+def test_data_range(client):
+    response = client.get(URL, headers={"Range": "bytes=0-9"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 0-9/{len(DATA)}"
+    assert response.content == DATA[:10]
+
+
+def test_data_invalid_range_is_ignored(client):
+    response = client.get(URL, headers={"Range": "bytes=5-3"})
+    assert response.status_code == 200
+    assert response.content == DATA
+
+
+def test_data_unsatisfiable_range(client):
+    response = client.get(URL, headers={"Range": f"bytes={len(DATA)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(DATA)}"
+
+
+def test_data_if_range(client):
+    response = client.get(URL, headers={"Range": "bytes=0-9", "If-Range": ETAG})
+    assert response.status_code == 206
+    response = client.get(URL, headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert response.status_code == 200
+    assert response.content == DATA
+
+
+def test_data_if_none_match(client):
+    for header in (ETAG, f'"other", W/{ETAG}', "*"):
+        response = client.get(URL, headers={"If-None-Match": header})
+        assert response.status_code == 304
+        assert response.headers["etag"] == ETAG
+        assert response.content == b""
+    response = client.get(URL, headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+    assert response.content == DATA
+
+
+
+def test_bundle_contents(client):
+    response = client.get("/ga4gh/drs/v1/objects/drugcentral.7")
+    assert response.status_code == 200
+    assert [(c["id"], c["name"]) for c in response.json()["contents"]] == [("drugcentral.7.atc", "atc.tsv.gz")]
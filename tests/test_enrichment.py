@@ -0,0 +1,14 @@
+from app.enrichment import EnrichmentIndex, Incidence
+
+PAIRS = [(c, "GO:1") for c in range(1, 4)] + [(c, "GO:2") for c in range(1, 3)] + \
+        [(c, "GO:3") for c in range(3, 10)] + [(1, "GO:4")]
+TERMS = {t: {"name": t, "type": "P"} for t in ("GO:1", "GO:2", "GO:3", "GO:4")}
+
+
+def test_min_count_does_not_change_fdr():
+    index = EnrichmentIndex({"go": Incidence(PAIRS, TERMS)}, {})
+    everything = {r["term_id"]: r for r in index.enrich("go", [], [1, 2, 3])["results"]}
+    filtered = index.enrich("go", [], [1, 2, 3], min_count=2)["results"]
+    assert [r["term_id"] for r in filtered] == ["GO:1", "GO:2"]
+    for r in filtered:
+        assert r["fdr"] == everything[r["term_id"]]["fdr"]
@@ -0,0 +1,41 @@
+import time
+from types import SimpleNamespace
+
+from app import profiler
+
+
+class Executor:
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        self.jobs.append((fn, args))
+
+
+def slow_call(statement="SELECT 1", ms=500):
+    conn = SimpleNamespace(info={}, dialect=SimpleNamespace(name="postgresql"), engine=None)
+    context = SimpleNamespace(profiler_start=time.perf_counter() - ms / 1000)
+    profiler._after(conn, SimpleNamespace(rowcount=1), statement, {}, context, False)
+
+
+def test_one_explain_in_flight(monkeypatch):
+    executor = Executor()
+    monkeypatch.setattr(profiler, "explain_executor", executor)
+    monkeypatch.setattr(profiler, "EXPLAIN_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(profiler, "stats", profiler.QueryStats())
+    for _ in range(5):
+        slow_call()
+    slow_call("SELECT 2")
+    assert len(executor.jobs) == 1
+    fn, args = executor.jobs[0]
+    entry, elapsed_ms = args[1], args[4]
+    assert entry["plan_pending"] and elapsed_ms >= 500
+
+    # finish the job as _explain would
+    entry["plan"], entry["plan_ms"], entry["plan_pending"] = [{}], elapsed_ms, False
+    profiler._explain_slot.release()
+    slow_call(ms=300)  # slow, but not slower than the plan already taken
+    assert len(executor.jobs) == 1
+    slow_call(ms=elapsed_ms + 1000)
+    assert len(executor.jobs) == 2
+    profiler._explain_slot.release()